@@ -24,7 +24,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_active_user
 from app.db.session import get_db
 from app.models.document import AcademicDocument
-from app.models.paper import Paper
 from app.models.project import Project
 from app.models.user import User
 from app.schemas.document import (
@@ -35,6 +34,7 @@ from app.schemas.document import (
     SectionGenerateRequest,
 )
 from app.services import document as doc_svc
+from app.services import research as research_svc
 
 router = APIRouter()
 
@@ -177,7 +177,7 @@ async def generate_one_section(
     field = project.field.value if project else "computer_science"
 
     papers_result = await db.execute(
-        select(Paper).where(Paper.owner_id == current_user.id).limit(8)
+        research_svc.library_select(current_user.id).limit(8)
     )
     papers = list(papers_result.scalars().all())
 
@@ -212,7 +212,7 @@ async def export_document(
     """Download the document as a formatted DOCX file."""
     doc = await _get_owned_document(document_id, db, current_user)
     papers_result = await db.execute(
-        select(Paper).where(Paper.owner_id == current_user.id).limit(20)
+        research_svc.library_select(current_user.id).limit(20)
     )
     papers = list(papers_result.scalars().all())
     docx_bytes = doc_svc.export_to_docx(doc, papers)
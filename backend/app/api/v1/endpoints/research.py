@@ -3,47 +3,65 @@ Research Library endpoints.
 
 Routes:
     POST   /api/v1/research/papers/ingest   - Ingest papers from DOI/arXiv/query
+    POST   /api/v1/research/papers/ingest/batch - Ingest up to 500 DOIs / arXiv IDs
     POST   /api/v1/research/papers/search   - Semantic search over indexed papers
     GET    /api/v1/research/papers          - List user's indexed papers
     GET    /api/v1/research/papers/{id}     - Get a specific paper
-    DELETE /api/v1/research/papers/{id}     - Delete a paper from the library
+    DELETE /api/v1/research/papers/{id}     - Remove a paper from the library
     POST   /api/v1/research/bulk-ingest     - Trigger Celery bulk-ingest task
+    GET    /api/v1/research/bulk-ingest/{task_id} - Bulk-ingest progress
+    POST   /api/v1/research/arxiv/harvest   - Trigger Celery paged arXiv harvest
 """
 
+import asyncio
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_active_user
+from app.db.redis import get_redis
 from app.db.session import get_db
-from app.models.paper import Paper
+from app.models.paper import Paper, UserPaper
 from app.models.user import User
 from app.schemas.research import (
+    ArxivHarvestRequest,
+    BatchIngestRequest,
+    BatchIngestResponse,
+    BulkIngestStatus,
+    IdentifierResult,
+    IngestResponse,
     PaperIngest,
     PaperListResponse,
     PaperResponse,
+    SearchPage,
     SearchRequest,
     SearchResult,
 )
-from app.services import chroma as chroma_svc
 from app.services import research as research_svc
+from app.services import search_cache
 
 router = APIRouter()
 
 
-@router.post("/papers/ingest", response_model=list[PaperResponse], status_code=201)
+def _task_owner_key(task_id: str) -> str:
+    return f"bulk_ingest:{task_id}:owner"
+
+
+@router.post("/papers/ingest", response_model=IngestResponse, status_code=201)
 async def ingest_papers(
     payload: PaperIngest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> list[Paper]:
+) -> IngestResponse:
     """
     Ingest papers into the user's research library.
-    Accepts a DOI, an arXiv ID, or a free-text query (fetches from Semantic Scholar + arXiv).
+    Accepts a DOI, an arXiv ID, or a free-text query. Queries fan out to every
+    registered source concurrently; a slow or failing source only drops its own
+    results and is reported in `sources`.
     """
     papers: list[Paper] = []
+    statuses: list[dict] = []
 
     if payload.doi:
         data = await research_svc.fetch_by_doi(payload.doi)
@@ -58,32 +76,107 @@ async def ingest_papers(
         papers.append(await research_svc.save_paper(db, data, current_user.id))
 
     elif payload.query:
+        unknown = set(payload.sources or []) - set(research_svc.SOURCES)
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown sources: {', '.join(sorted(unknown))}")
         limit = min(payload.limit, 10)
-        ss_results = await research_svc.search_semantic_scholar(payload.query, limit=limit)
-        ax_results = await research_svc.search_arxiv(payload.query, limit=limit)
-        for pdata in ss_results + ax_results:
-            paper = await research_svc.save_paper(db, pdata, current_user.id)
-            papers.append(paper)
+        results, statuses = await research_svc.search_all_sources(
+            payload.query, limit=limit, sources=payload.sources
+        )
+        papers = await research_svc.save_papers(db, results, current_user.id)
     else:
         raise HTTPException(status_code=422, detail="Provide doi, arxiv_id, or query")
 
-    return papers
+    # Commit before queuing so the indexer sees the rows; embedding happens write-behind
+    await db.commit()
+    await research_svc.publish_saved(db, current_user.id, papers)
+    return IngestResponse(
+        papers=[PaperResponse.model_validate(p) for p in papers],
+        sources=statuses,
+    )
+
+
+@router.post("/papers/ingest/batch", response_model=BatchIngestResponse, status_code=201)
+async def ingest_papers_batch(
+    payload: BatchIngestRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> BatchIngestResponse:
+    """
+    Ingest a whole reading list. DOIs resolve through Semantic Scholar's batch
+    lookup and arXiv IDs through chunked `id_list` queries; both run concurrently.
+    Every identifier gets its own outcome, so one bad entry never fails the batch.
+    """
+    # identifier as submitted -> normalized lookup key (dedupes repeats; '' if blank)
+    dois = {raw: research_svc.normalize_doi(raw) for raw in payload.dois}
+    arxiv_ids = {raw: research_svc.normalize_arxiv_id(raw) for raw in payload.arxiv_ids}
 
+    (doi_found, doi_failed), (ax_found, ax_failed) = await asyncio.gather(
+        research_svc.fetch_by_dois([key for key in dict.fromkeys(dois.values()) if key]),
+        research_svc.fetch_arxiv_batch([key for key in dict.fromkeys(arxiv_ids.values()) if key]),
+    )
 
-@router.post("/papers/search", response_model=list[SearchResult])
+    # Persist every resolved paper in one bulk write
+    resolved = [("doi", key, paper) for key, paper in doi_found.items()]
+    resolved += [("arxiv", key, paper) for key, paper in ax_found.items()]
+    stored = await research_svc.save_papers(db, [paper for _, _, paper in resolved], current_user.id)
+    await db.commit()
+    await research_svc.publish_saved(db, current_user.id, stored)
+    saved = {(kind, key): paper.id for (kind, key, _), paper in zip(resolved, stored)}
+
+    results: list[IdentifierResult] = []
+    for kind, identifiers, failed in (
+        ("doi", dois, doi_failed),
+        ("arxiv", arxiv_ids, ax_failed),
+    ):
+        for raw, key in identifiers.items():
+            if not key:
+                results.append(
+                    IdentifierResult(identifier=raw, kind=kind, status="invalid", detail="Empty identifier")
+                )
+            elif (kind, key) in saved:
+                results.append(
+                    IdentifierResult(identifier=raw, kind=kind, status="ingested", paper_id=saved[(kind, key)])
+                )
+            elif key in failed:
+                results.append(IdentifierResult(identifier=raw, kind=kind, status="error", detail=failed[key]))
+            else:
+                results.append(IdentifierResult(identifier=raw, kind=kind, status="not_found"))
+
+    ingested = sum(1 for r in results if r.status == "ingested")
+    return BatchIngestResponse(results=results, ingested=ingested, failed=len(results) - ingested)
+
+
+@router.post("/papers/search", response_model=SearchPage)
 async def search_papers(
     payload: SearchRequest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> list[SearchResult]:
-    """Semantic search over the user's indexed paper library."""
-    results = await research_svc.semantic_search(
+) -> SearchPage:
+    """
+    Semantic, full-text or hybrid search over the user's paper library.
+    Pass a page's next_cursor back with the same query to get the next page.
+    """
+    try:
+        offset = search_cache.decode_cursor(payload.cursor) if payload.cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    results, next_offset = await research_svc.search_library(
         query=payload.query,
         db=db,
         owner_id=current_user.id,
         limit=payload.limit,
+        mode=payload.mode,
+        offset=offset,
+        field=payload.field_filter,
+        year_from=payload.year_from,
+        year_to=payload.year_to,
+        source=payload.source,
+    )
+    return SearchPage(
+        items=[SearchResult(paper=PaperResponse.model_validate(p), score=score) for p, score in results],
+        next_cursor=search_cache.encode_cursor(next_offset) if next_offset is not None else None,
     )
-    return [SearchResult(paper=PaperResponse.model_validate(p), score=score) for p, score in results]
 
 
 @router.get("/papers", response_model=PaperListResponse)
@@ -93,19 +186,16 @@ async def list_papers(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
 ) -> PaperListResponse:
-    """List all papers in the user's research library."""
+    """List all papers in the user's research library, most recently added first."""
     rows = await db.execute(
-        select(Paper)
-        .where(Paper.owner_id == current_user.id)
-        .order_by(Paper.created_at.desc())
+        research_svc.library_select(current_user.id)
+        .order_by(UserPaper.created_at.desc())
         .offset(skip)
         .limit(limit)
     )
     papers = list(rows.scalars().all())
-    count = await db.execute(
-        select(func.count()).select_from(Paper).where(Paper.owner_id == current_user.id)
-    )
-    return PaperListResponse(items=papers, total=count.scalar_one())
+    total = await research_svc.count_library(db, current_user.id)
+    return PaperListResponse(items=papers, total=total)
 
 
 @router.get("/papers/{paper_id}", response_model=PaperResponse)
@@ -114,10 +204,7 @@ async def get_paper(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Paper:
-    result = await db.execute(
-        select(Paper).where(Paper.id == paper_id, Paper.owner_id == current_user.id)
-    )
-    paper = result.scalar_one_or_none()
+    paper = await research_svc.get_library_paper(db, current_user.id, paper_id)
     if not paper:
         raise HTTPException(status_code=404, detail="Paper not found")
     return paper
@@ -129,15 +216,11 @@ async def delete_paper(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Response:
-    result = await db.execute(
-        select(Paper).where(Paper.id == paper_id, Paper.owner_id == current_user.id)
-    )
-    paper = result.scalar_one_or_none()
-    if not paper:
+    """Remove a paper from the user's library (the shared paper record is kept)."""
+    if not await research_svc.remove_from_library(db, current_user.id, paper_id):
         raise HTTPException(status_code=404, detail="Paper not found")
-    if paper.chroma_id:
-        chroma_svc.delete_paper(paper.chroma_id)
-    await db.delete(paper)
+    await db.commit()
+    await search_cache.bump_library_version(current_user.id)
     return Response(status_code=204)
 
 
@@ -146,7 +229,56 @@ async def bulk_ingest(
     queries: list[str],
     current_user: User = Depends(get_current_active_user),
 ) -> dict:
-    """Trigger a Celery task to bulk-ingest papers for a list of queries."""
+    """
+    Trigger a Celery task to bulk-ingest papers for a list of queries.
+    The owner is recorded before the task is queued, for as long as its result is kept.
+    """
+    from app.tasks.celery_app import celery_app
     from app.tasks.research_tasks import bulk_ingest_task
-    task = bulk_ingest_task.delay(queries, str(current_user.id))
-    return {"task_id": task.id, "status": "queued", "queries": queries}
+
+    task_id = str(uuid.uuid4())
+    await get_redis().set(_task_owner_key(task_id), str(current_user.id), ex=celery_app.conf.result_expires)
+    bulk_ingest_task.apply_async(args=(queries, str(current_user.id)), task_id=task_id)
+    return {"task_id": task_id, "status": "queued", "queries": queries}
+
+
+@router.get("/bulk-ingest/{task_id}", response_model=BulkIngestStatus)
+async def bulk_ingest_status(
+    task_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> BulkIngestStatus:
+    """
+    Progress of a bulk-ingest task (queries done, papers ingested, errors).
+    Only the user who queued it can read it; any other task id is 404.
+    """
+    from celery.result import AsyncResult
+
+    from app.tasks.celery_app import celery_app
+
+    owner = await get_redis().get(_task_owner_key(task_id))
+    if owner is None or owner.decode() != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    result = AsyncResult(task_id, app=celery_app)
+    info = result.info if isinstance(result.info, dict) else {}
+    if result.failed():
+        info = {"errors": [str(result.info)]}
+    return BulkIngestStatus(
+        task_id=task_id,
+        state=result.state,
+        total_queries=info.get("total_queries"),
+        queries_done=info.get("queries_done", 0),
+        papers_ingested=info.get("papers_ingested", 0),
+        errors=info.get("errors", []),
+    )
+
+
+@router.post("/arxiv/harvest", status_code=202)
+async def harvest_arxiv(
+    payload: ArxivHarvestRequest,
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """Trigger a Celery task that pages through arXiv and streams results into the library."""
+    from app.tasks.research_tasks import harvest_arxiv_task
+    task = harvest_arxiv_task.delay(payload.query, str(current_user.id), payload.max_results)
+    return {"task_id": task.id, "status": "queued", "query": payload.query}
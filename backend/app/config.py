@@ -47,12 +47,74 @@ class Settings(BaseSettings):
     CHROMA_API_KEY: Optional[str] = None
     CHROMA_COLLECTION_DOCUMENTS: str = "mining_documents"
     CHROMA_COLLECTION_RESEARCH: str = "mining_research"
+    # Mirror each user's library into its own collection so searches need no owner filter
+    # (reconcile backfills tenant collections, e.g. after turning this on)
+    CHROMA_TENANT_COLLECTIONS: bool = False
+    # Without tenant collections: library paper ids per vector query's paper_id $in
+    # filter (larger libraries are searched in several queries and the hits merged)
+    VECTOR_SEARCH_IDS_PER_QUERY: int = 2000
+    # Threads running blocking vector-store calls off the event loop
+    VECTOR_STORE_MAX_WORKERS: int = 8
+
+    # --- Vector store backend ---
+    # 'chroma' (ChromaDB server) or 'local' (in-process memory-mapped index)
+    VECTOR_BACKEND: str = "chroma"
+    VECTOR_INDEX_DIR: str = "./data/vector_index"
+    VECTOR_INDEX_DTYPE: str = "float32"  # 'float32' | 'int8'
+    # IVF partitions for large local indexes (0 = exact search over every row)
+    VECTOR_INDEX_IVF_LISTS: int = 0
+    VECTOR_INDEX_IVF_PROBE: int = 8
+    # Papers streamed and upserted per step of the reindex job
+    REINDEX_BATCH_SIZE: int = 500
+    # Periodic Postgres <-> vector store reconciliation (Celery beat)
+    RECONCILE_INTERVAL_SECONDS: int = 6 * 3600
+    RECONCILE_PAGE_SIZE: int = 5000
+
+    # --- Outbound HTTP (Semantic Scholar, arXiv) ---
+    HTTP_TIMEOUT_SECONDS: float = 20.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    HTTP2_ENABLED: bool = False
+
+    # --- Research ingest ---
+    # Per-source deadline for the multi-source search fan-out
+    RESEARCH_SOURCE_TIMEOUT_SECONDS: float = 8.0
+    # Queries searched concurrently by the bulk-ingest task
+    BULK_INGEST_CONCURRENCY: int = 8
+    # Write-behind indexing: papers embedded per indexer transaction, and how
+    # often beat sweeps up papers still pending or failed
+    INDEXING_BATCH_SIZE: int = 200
+    INDEXING_SWEEP_INTERVAL_SECONDS: int = 300
+
+    # --- Upstream rate limits (Redis token buckets, shared cluster-wide) ---
+    SEMANTIC_SCHOLAR_API_KEY: Optional[str] = None
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_SEMANTIC_SCHOLAR_PER_SECOND: float = 1.0
+    RATE_LIMIT_SEMANTIC_SCHOLAR_BURST: int = 1
+    # arXiv API terms: no more than one request every 3 seconds
+    RATE_LIMIT_ARXIV_PER_SECOND: float = 1 / 3
+    RATE_LIMIT_ARXIV_BURST: int = 1
+
+    # --- Upstream response cache (Redis, shared by API and workers) ---
+    UPSTREAM_CACHE_ENABLED: bool = True
+    UPSTREAM_CACHE_SEARCH_TTL_SECONDS: int = 6 * 3600
+    UPSTREAM_CACHE_LOOKUP_TTL_SECONDS: int = 7 * 24 * 3600
+    UPSTREAM_CACHE_NEGATIVE_TTL_SECONDS: int = 15 * 60
+    UPSTREAM_CACHE_LOCK_SECONDS: int = 10
+
+    # --- Library search cache (Redis, invalidated per owner on library changes) ---
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL_SECONDS: int = 10 * 60
+    SEARCH_RESULT_DEPTH: int = 200  # ranked candidates computed per query; pagination stops there
 
     # --- Security ---
     SECRET_KEY: str = "changeme-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Bearer token required by GET /metrics; the endpoint is disabled (404) while unset
+    METRICS_TOKEN: Optional[str] = None
 
     # --- CORS ---
     ALLOWED_ORIGINS: str = "http://localhost:3000"
@@ -62,13 +124,32 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4o"
     ANTHROPIC_API_KEY: Optional[str] = None
     ANTHROPIC_MODEL: str = "claude-opus-4-6"
+    # Shared AsyncAnthropic client (app.services.llm)
+    LLM_TIMEOUT_SECONDS: float = 120.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_MAX_CONNECTIONS: int = 20
+    # Shortest system prompt marked for prompt caching: the model's minimum
+    # cacheable length (1024 tokens for Opus/Sonnet, 2048 for Haiku models)
+    PROMPT_CACHE_MIN_TOKENS: int = 1024
 
     # --- Embedding ---
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     EMBEDDING_DIMENSIONS: int = 1536
+    # Query-embedding cache: in-process LRU entries, then Redis TTL
+    EMBEDDING_QUERY_CACHE_SIZE: int = 2048
+    EMBEDDING_QUERY_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    # Document micro-batching: flush at N items / token budget / T ms after the first
+    EMBEDDING_BATCH_MAX_ITEMS: int = 256
+    EMBEDDING_BATCH_MAX_TOKENS: int = 250_000
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 50
+    # Longer inputs are truncated (text-embedding-3 accepts 8191 tokens)
+    EMBEDDING_MAX_INPUT_TOKENS: int = 8000
 
     # --- Document Processing ---
     MAX_UPLOAD_SIZE_MB: int = 50
+    # Sections of one document generated at once by generate_all_sections_task
+    DOCUMENT_SECTION_CONCURRENCY: int = 4
 
     # --- Feature Flags ---
     ENABLE_RESEARCH_AGENT: bool = True
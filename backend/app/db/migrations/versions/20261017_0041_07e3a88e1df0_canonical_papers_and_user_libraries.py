@@ -0,0 +1,205 @@
+"""canonical papers and user libraries
+
+Papers become one canonical row per work (unique canonical_key, identity
+fingerprints, write-behind index_status and a generated full-text
+search_vector) and users reference them through user_papers. Existing
+per-owner rows are folded: copies of the same work (services.identity) merge
+into the oldest row and every former owner gets a library link to it, dated
+when they added their copy. Merged papers are left 'pending', so the indexer
+re-embeds them with the current metadata; vectors of the removed copies are
+purged by reconcile.
+
+Revision ID: 07e3a88e1df0
+Revises: 486a735b2fda
+Create Date: 2026-10-17 00:41:31.260783+00:00
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.services.identity import (
+    canonical_key,
+    merge_duplicates,
+    normalize_arxiv_id,
+    normalize_doi,
+    title_fingerprint,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '07e3a88e1df0'
+down_revision: Union[str, None] = '486a735b2fda'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 1000
+
+papers = sa.table(
+    "papers",
+    sa.column("id", sa.UUID()),
+    sa.column("owner_id", sa.UUID()),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("title", sa.String()),
+    sa.column("abstract", sa.Text()),
+    sa.column("authors", sa.JSON()),
+    sa.column("year", sa.Integer()),
+    sa.column("doi", sa.String()),
+    sa.column("arxiv_id", sa.String()),
+    sa.column("url", sa.String()),
+    sa.column("source", sa.String()),
+    sa.column("field_tags", sa.JSON()),
+    sa.column("citations_count", sa.Integer()),
+    sa.column("chroma_id", sa.String()),
+    sa.column("canonical_key", sa.String()),
+    sa.column("title_fingerprint", sa.String()),
+)
+user_papers = sa.table(
+    "user_papers",
+    sa.column("id", sa.UUID()),
+    sa.column("user_id", sa.UUID()),
+    sa.column("paper_id", sa.UUID()),
+    sa.column("tags", sa.JSON()),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+_FIELDS = ("title", "abstract", "authors", "year", "doi", "url", "source", "field_tags", "citations_count")
+
+
+def _fold_owner_copies() -> None:
+    """Merge per-owner copies of a work into its oldest row and link every owner to it."""
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(papers.c.id, papers.c.owner_id, papers.c.created_at, *(papers.c[f] for f in _FIELDS))
+        .order_by(papers.c.created_at, papers.c.id)
+    ).mappings().all()
+    if not rows:
+        return
+
+    records = []
+    for row in rows:
+        record = {f: row[f] for f in _FIELDS}
+        record["doi"] = normalize_doi(row["doi"]) if row["doi"] else None
+        url = row["url"] or ""
+        record["arxiv_id"] = normalize_arxiv_id(url) if "arxiv.org/abs/" in url else None
+        records.append(record)
+    merged, index = merge_duplicates(records)
+
+    keepers: dict[int, uuid.UUID] = {}
+    links: dict[tuple[uuid.UUID, uuid.UUID], object] = {}
+    for row, slot in zip(rows, index):
+        keeper = keepers.setdefault(slot, row["id"])
+        links.setdefault((row["owner_id"], keeper), row["created_at"])
+
+    updates = [
+        {
+            "_id": keepers[slot],
+            **{f: record[f] for f in _FIELDS},
+            "arxiv_id": record["arxiv_id"],
+            "canonical_key": canonical_key(record),
+            "title_fingerprint": title_fingerprint(record["title"], record["year"]),
+        }
+        for slot, record in enumerate(merged)
+    ]
+    stmt = (
+        sa.update(papers)
+        .where(papers.c.id == sa.bindparam("_id"))
+        .values(
+            {f: sa.bindparam(f) for f in (*_FIELDS, "arxiv_id", "canonical_key", "title_fingerprint")}
+            | {"chroma_id": None}
+        )
+    )
+    for start in range(0, len(updates), _BATCH):
+        bind.execute(stmt, updates[start:start + _BATCH])
+
+    link_rows = [
+        {"id": uuid.uuid4(), "user_id": user_id, "paper_id": paper_id, "tags": [],
+         "created_at": added, "updated_at": added}
+        for (user_id, paper_id), added in links.items()
+    ]
+    for start in range(0, len(link_rows), _BATCH):
+        bind.execute(sa.insert(user_papers), link_rows[start:start + _BATCH])
+
+    kept = set(keepers.values())
+    removed = [row["id"] for row in rows if row["id"] not in kept]
+    for start in range(0, len(removed), _BATCH):
+        bind.execute(sa.delete(papers).where(papers.c.id.in_(removed[start:start + _BATCH])))
+
+
+def upgrade() -> None:
+    op.create_table('user_papers',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('paper_id', sa.UUID(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('tags', sa.JSON(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'paper_id', name='uq_user_papers_user_paper')
+    )
+    op.create_index(op.f('ix_user_papers_paper_id'), 'user_papers', ['paper_id'], unique=False)
+    op.create_index(op.f('ix_user_papers_user_id'), 'user_papers', ['user_id'], unique=False)
+    op.add_column('papers', sa.Column('canonical_key', sa.String(length=600), nullable=True))
+    op.add_column('papers', sa.Column('arxiv_id', sa.String(length=50), nullable=True))
+    op.add_column('papers', sa.Column('title_fingerprint', sa.String(length=40), nullable=True))
+    op.add_column('papers', sa.Column('index_status', sa.String(length=20), server_default='pending', nullable=False))
+
+    _fold_owner_copies()
+
+    op.alter_column('papers', 'canonical_key', existing_type=sa.String(length=600), nullable=False)
+    op.create_unique_constraint('papers_canonical_key_key', 'papers', ['canonical_key'])
+    op.add_column('papers', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(abstract, '')), 'B')", persisted=True), nullable=True))
+    op.create_index(op.f('ix_papers_arxiv_id'), 'papers', ['arxiv_id'], unique=False)
+    op.create_index(op.f('ix_papers_index_status'), 'papers', ['index_status'], unique=False)
+    op.create_index('ix_papers_search_vector', 'papers', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(op.f('ix_papers_title_fingerprint'), 'papers', ['title_fingerprint'], unique=False)
+    op.drop_index('ix_papers_owner_id', table_name='papers')
+    op.drop_constraint('papers_owner_id_fkey', 'papers', type_='foreignkey')
+    op.drop_column('papers', 'owner_id')
+
+
+def downgrade() -> None:
+    # Back to per-owner rows: each paper goes to its earliest library link and
+    # every further link gets its own copy; papers in no library are dropped
+    op.add_column('papers', sa.Column('owner_id', sa.UUID(), nullable=True))
+    op.drop_constraint('papers_canonical_key_key', 'papers', type_='unique')
+    op.execute("""
+        WITH ranked AS (
+            SELECT user_id, paper_id, created_at, updated_at,
+                   row_number() OVER (PARTITION BY paper_id ORDER BY created_at, id) AS rn
+            FROM user_papers
+        ),
+        owned AS (
+            UPDATE papers SET owner_id = ranked.user_id
+            FROM ranked WHERE ranked.paper_id = papers.id AND ranked.rn = 1
+        )
+        INSERT INTO papers (id, created_at, updated_at, title, abstract, authors, year, doi, url,
+                            source, field_tags, citations_count, owner_id, canonical_key)
+        SELECT gen_random_uuid(), ranked.created_at, ranked.updated_at, p.title, p.abstract,
+               p.authors, p.year, p.doi, p.url, p.source, p.field_tags, p.citations_count,
+               ranked.user_id, p.canonical_key
+        FROM ranked JOIN papers p ON p.id = ranked.paper_id
+        WHERE ranked.rn > 1
+    """)
+    op.execute("DELETE FROM papers WHERE owner_id IS NULL")
+    op.alter_column('papers', 'owner_id', existing_type=sa.UUID(), nullable=False)
+    op.create_foreign_key('papers_owner_id_fkey', 'papers', 'users', ['owner_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_papers_owner_id', 'papers', ['owner_id'], unique=False)
+    op.drop_index(op.f('ix_papers_title_fingerprint'), table_name='papers')
+    op.drop_index('ix_papers_search_vector', table_name='papers', postgresql_using='gin')
+    op.drop_index(op.f('ix_papers_index_status'), table_name='papers')
+    op.drop_index(op.f('ix_papers_arxiv_id'), table_name='papers')
+    op.drop_column('papers', 'search_vector')
+    op.drop_column('papers', 'index_status')
+    op.drop_column('papers', 'title_fingerprint')
+    op.drop_column('papers', 'arxiv_id')
+    op.drop_column('papers', 'canonical_key')
+    op.drop_index(op.f('ix_user_papers_user_id'), table_name='user_papers')
+    op.drop_index(op.f('ix_user_papers_paper_id'), table_name='user_papers')
+    op.drop_table('user_papers')
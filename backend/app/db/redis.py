@@ -0,0 +1,42 @@
+"""
+Mining AI Platform - Shared Redis Client.
+
+Provides:
+- get_redis(): lazily-created asyncio Redis client (one connection pool per process)
+- close_redis(): release the pool on shutdown
+
+Used for shared caches, counters and coordination between the API and
+Celery workers. Callers treat Redis as best-effort: if it is unreachable
+they fall back to uncached behaviour instead of failing the request.
+"""
+
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_client: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """Return the process-wide Redis client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=1,
+            socket_timeout=2,
+            health_check_interval=30,
+        )
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the Redis connection pool (call on process shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -8,12 +8,18 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import structlog
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
+from app.api.deps import require_metrics_token
 from app.api.v1.router import api_router
 from app.config import get_settings
+from app.db.redis import close_redis
+from app.services import embeddings
+from app.services import http as http_svc
+from app.services import llm, metrics, vector_store
+from app.services.research import UPSTREAM_URLS
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
@@ -27,10 +33,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         environment=settings.ENVIRONMENT,
         version="0.1.0",
     )
-    # Future: initialize DB pool, ChromaDB client, warm caches here
+    http_svc.init_http_clients(*UPSTREAM_URLS)
+    llm.init_llm_client()
+    await vector_store.init()
     yield
     logger.info("Shutting down Mining AI API")
-    # Future: close DB pool, flush queues here
+    await http_svc.close_http_clients()
+    await llm.close_llm_client()
+    await embeddings.close_embeddings()
+    vector_store.shutdown()
+    await close_redis()
 
 
 def create_application() -> FastAPI:
@@ -69,3 +81,17 @@ async def health_check() -> dict:
         "version": "0.1.0",
         "environment": settings.ENVIRONMENT,
     }
+
+
+@app.get(
+    "/metrics",
+    tags=["health"],
+    summary="Cluster-wide counters and histograms",
+    dependencies=[Depends(require_metrics_token)],
+)
+async def get_metrics() -> dict:
+    """
+    Counters, gauges and histograms recorded by the API and Celery workers.
+    Requires `Authorization: Bearer <METRICS_TOKEN>`; returns 404 while METRICS_TOKEN is unset.
+    """
+    return await metrics.snapshot()
@@ -1,30 +1,69 @@
 import uuid
 
-from sqlalchemy import ForeignKey, Integer, JSON, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Computed, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base, TimestampMixin, UUIDMixin
 
 
 class Paper(UUIDMixin, TimestampMixin, Base):
-    """Indexed academic paper stored per-user."""
+    """
+    Canonical academic paper, stored and embedded once for all users.
+    Users reference it through UserPaper library links.
+    """
 
     __tablename__ = "papers"
+    __table_args__ = (Index("ix_papers_search_vector", "search_vector", postgresql_using="gin"),)
 
+    # Strongest identity fingerprint ('doi:…' | 'arxiv:…' | 'title:…') — target of save_papers' ON CONFLICT
+    canonical_key: Mapped[str] = mapped_column(String(600), nullable=False, unique=True)
     title: Mapped[str] = mapped_column(String(1000), nullable=False, index=True)
     abstract: Mapped[str | None] = mapped_column(Text, nullable=True)
     authors: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
     year: Mapped[int | None] = mapped_column(Integer, nullable=True)
     doi: Mapped[str | None] = mapped_column(String(500), nullable=True, index=True)
+    arxiv_id: Mapped[str | None] = mapped_column(String(50), nullable=True, index=True)
+    # sha1 of normalized title + year (see services.identity.title_fingerprint)
+    title_fingerprint: Mapped[str | None] = mapped_column(String(40), nullable=True, index=True)
     url: Mapped[str | None] = mapped_column(String(2000), nullable=True)
     source: Mapped[str] = mapped_column(String(50), nullable=False, default="manual")
     field_tags: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
     citations_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     chroma_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    owner_id: Mapped[uuid.UUID] = mapped_column(
+    # Write-behind embedding state: 'pending' | 'indexed' | 'failed' (see research.index_pending)
+    index_status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="pending", server_default="pending", index=True
+    )
+    # Full-text document (title weighted above abstract), generated by Postgres on every write
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(abstract, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+
+class UserPaper(UUIDMixin, TimestampMixin, Base):
+    """A paper in one user's research library (created_at = date added)."""
+
+    __tablename__ = "user_papers"
+    __table_args__ = (UniqueConstraint("user_id", "paper_id", name="uq_user_papers_user_paper"),)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
+    paper_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("papers.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    tags: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
@@ -1,16 +1,41 @@
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
+
+MAX_BATCH_IDENTIFIERS = 500
+MAX_HARVEST_RESULTS = 10_000
 
 
 class PaperIngest(BaseModel):
     """Ingest a paper by DOI, arXiv ID, or search query."""
     doi: Optional[str] = None
     arxiv_id: Optional[str] = None
-    query: Optional[str] = None  # search Semantic Scholar
+    query: Optional[str] = None  # search every registered source
     limit: int = 5  # papers to fetch per search query
+    sources: Optional[list[str]] = None  # restrict the query fan-out; None = all
+
+
+class BatchIngestRequest(BaseModel):
+    """Ingest a reading list of DOIs and/or arXiv IDs in one request."""
+    dois: list[str] = Field(default_factory=list)
+    arxiv_ids: list[str] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_size(self) -> "BatchIngestRequest":
+        total = len(self.dois) + len(self.arxiv_ids)
+        if total == 0:
+            raise ValueError("Provide at least one DOI or arXiv ID")
+        if total > MAX_BATCH_IDENTIFIERS:
+            raise ValueError(f"At most {MAX_BATCH_IDENTIFIERS} identifiers per request")
+        return self
+
+
+class ArxivHarvestRequest(BaseModel):
+    """Harvest a large arXiv result set in the background."""
+    query: str
+    max_results: int = Field(1000, ge=1, le=MAX_HARVEST_RESULTS)
 
 
 class PaperResponse(BaseModel):
@@ -22,14 +47,54 @@ class PaperResponse(BaseModel):
     authors: list[str]
     year: Optional[int]
     doi: Optional[str]
+    arxiv_id: Optional[str]
     url: Optional[str]
     source: str
     field_tags: list[str]
     citations_count: int
-    owner_id: uuid.UUID
+    index_status: str  # 'pending' until embedded for semantic search, then 'indexed' ('failed' is retried)
     created_at: datetime
 
 
+class SourceStatus(BaseModel):
+    """Outcome of one upstream source during a query fan-out."""
+    source: str
+    status: str  # 'ok' | 'timeout' | 'rate_limited' | 'error'
+    count: int = 0
+    elapsed_ms: int = 0
+    detail: Optional[str] = None
+
+
+class IngestResponse(BaseModel):
+    papers: list[PaperResponse]
+    sources: list[SourceStatus] = []
+
+
+class IdentifierResult(BaseModel):
+    """Per-identifier outcome of a batch ingest."""
+    identifier: str
+    kind: str  # 'doi' | 'arxiv'
+    status: str  # 'ingested' | 'not_found' | 'invalid' | 'error'
+    paper_id: Optional[uuid.UUID] = None
+    detail: Optional[str] = None
+
+
+class BatchIngestResponse(BaseModel):
+    results: list[IdentifierResult]
+    ingested: int
+    failed: int
+
+
+class BulkIngestStatus(BaseModel):
+    """Progress of a bulk-ingest Celery task."""
+    task_id: str
+    state: str  # PENDING | STARTED | PROGRESS | SUCCESS | FAILURE
+    total_queries: Optional[int] = None
+    queries_done: int = 0
+    papers_ingested: int = 0
+    errors: list[str] = []
+
+
 class PaperListResponse(BaseModel):
     items: list[PaperResponse]
     total: int
@@ -38,9 +103,20 @@ class PaperListResponse(BaseModel):
 class SearchRequest(BaseModel):
     query: str
     limit: int = 10
-    field_filter: Optional[str] = None
+    field_filter: Optional[str] = None  # e.g. 'computer_science' or 'Computer Science'
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    source: Optional[str] = None  # 'semantic_scholar' | 'arxiv' | 'manual'
+    # semantic: vector search | keyword: full-text | hybrid: both, rank-fused
+    mode: Literal["semantic", "keyword", "hybrid"] = "semantic"
+    cursor: Optional[str] = None  # next_cursor of the previous page
 
 
 class SearchResult(BaseModel):
     paper: PaperResponse
     score: float  # relevance score 0-1
+
+
+class SearchPage(BaseModel):
+    items: list[SearchResult]
+    next_cursor: Optional[str] = None  # None on the last page
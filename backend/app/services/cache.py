@@ -0,0 +1,173 @@
+"""
+Upstream response cache — shares Semantic Scholar / arXiv responses across
+every API process and Celery worker through Redis.
+
+Keys are `upstream:<provider>:<key>` where key is built from the operation
+plus the normalized query or identifier (see normalize_query). Misses (None
+or empty results) are cached too, for a shorter TTL, so repeated lookups of
+unknown DOIs do not hit the network. Concurrent misses on the same key are
+coalesced with a short Redis lock: one caller loads, the others wait for its
+result instead of stampeding the provider.
+
+Loader exceptions are never cached. If Redis is unreachable the cache is
+bypassed and the loader is called directly.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+import orjson
+
+from app.config import get_settings
+from app.db.redis import get_redis
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_PREFIX = "upstream"
+_NEGATIVE = b"\x00miss"
+_LOCK_POLL_SECONDS = 0.05
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Deletes the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def normalize_query(text: str) -> str:
+    """Case- and whitespace-insensitive form of a free-text query."""
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def _redis_key(provider: str, key: str) -> str:
+    # Hash long keys so Redis key size stays bounded
+    if len(key) > 200:
+        key = hashlib.sha1(key.encode()).hexdigest()
+    return f"{_PREFIX}:{provider}:{key}"
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == [] or value == {}
+
+
+def _encode(value: Any, ttl: int) -> tuple[bytes, int]:
+    """Return (payload, ttl); empty results become short-lived negative entries."""
+    if _is_empty(value):
+        return _NEGATIVE, settings.UPSTREAM_CACHE_NEGATIVE_TTL_SECONDS
+    return orjson.dumps(value), ttl
+
+
+def _load_raw(raw: bytes, empty: Any) -> Any:
+    return empty if raw == _NEGATIVE else orjson.loads(raw)
+
+
+async def cached(
+    provider: str,
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+    empty: Any = None,
+) -> Any:
+    """
+    Return the cached value for (provider, key), or call `loader` and cache it.
+
+    `empty` is what a negative-cache hit returns (None for lookups, [] for searches).
+    """
+    if not settings.UPSTREAM_CACHE_ENABLED:
+        return await loader()
+
+    redis = get_redis()
+    rkey = _redis_key(provider, key)
+    try:
+        raw = await redis.get(rkey)
+    except Exception as exc:
+        logger.debug("Upstream cache unavailable (%s): %s", rkey, exc)
+        return await loader()
+
+    if raw is not None:
+        await metrics.incr(f"upstream_cache.{provider}.{'negative_hit' if raw == _NEGATIVE else 'hit'}")
+        return _load_raw(raw, empty)
+    await metrics.incr(f"upstream_cache.{provider}.miss")
+
+    # Stampede protection: only the lock holder calls the provider
+    lock_key = f"{rkey}:lock"
+    token = uuid.uuid4().hex
+    lock_seconds = settings.UPSTREAM_CACHE_LOCK_SECONDS
+    try:
+        acquired = await redis.set(lock_key, token, nx=True, ex=lock_seconds)
+    except Exception:
+        acquired = True  # Redis flaked between calls — just load
+
+    if not acquired:
+        waited = 0.0
+        while waited < lock_seconds:
+            await asyncio.sleep(_LOCK_POLL_SECONDS)
+            waited += _LOCK_POLL_SECONDS
+            try:
+                raw = await redis.get(rkey)
+                if raw is not None:
+                    await metrics.incr(f"upstream_cache.{provider}.coalesced")
+                    return _load_raw(raw, empty)
+                if not await redis.exists(lock_key):
+                    break  # holder failed without caching; load ourselves
+            except Exception:
+                break
+
+    try:
+        value = await loader()
+        try:
+            payload, expiry = _encode(value, ttl)
+            await redis.set(rkey, payload, ex=expiry)
+        except Exception as exc:
+            logger.debug("Upstream cache write failed (%s): %s", rkey, exc)
+        return value
+    finally:
+        if acquired:
+            try:
+                await redis.eval(_RELEASE_LOCK, 1, lock_key, token)
+            except Exception:
+                pass
+
+
+async def get_many(provider: str, keys: list[str]) -> dict[str, Optional[Any]]:
+    """
+    Bulk cache read. Returns key -> value for hits (None for negative hits);
+    keys that were not cached are absent from the result.
+    """
+    if not settings.UPSTREAM_CACHE_ENABLED or not keys:
+        return {}
+    try:
+        raws = await get_redis().mget([_redis_key(provider, k) for k in keys])
+    except Exception as exc:
+        logger.debug("Upstream cache unavailable (%s bulk read): %s", provider, exc)
+        return {}
+    found = {k: _load_raw(raw, None) for k, raw in zip(keys, raws) if raw is not None}
+    if found:
+        await metrics.incr(f"upstream_cache.{provider}.hit", len(found))
+    if len(found) < len(keys):
+        await metrics.incr(f"upstream_cache.{provider}.miss", len(keys) - len(found))
+    return found
+
+
+async def set_many(provider: str, values: dict[str, Any], ttl: int) -> None:
+    """Bulk cache write; None/empty values are stored as negative entries."""
+    if not settings.UPSTREAM_CACHE_ENABLED or not values:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for key, value in values.items():
+            payload, expiry = _encode(value, ttl)
+            pipe.set(_redis_key(provider, key), payload, ex=expiry)
+        await pipe.execute()
+    except Exception as exc:
+        logger.debug("Upstream cache bulk write failed (%s): %s", provider, exc)
@@ -3,19 +3,33 @@ ChromaDB service — manages vector storage for research papers.
 
 Uses OpenAI text-embedding-3-small when OPENAI_API_KEY is set.
 Falls back to ChromaDB's built-in embedding function otherwise.
+
+The HTTP client, embedding function and collection handles are created once
+per process (warmed by init_chroma() at API startup and Celery worker init)
+and reused by every call; a failed call drops them and reconnects once.
 """
 
 import logging
-from typing import Any, Optional
+import re
+import threading
+from collections.abc import Callable
+from typing import Any, Optional, TypeVar
 
 import chromadb
+from chromadb.api import ClientAPI
+from chromadb.api.models.Collection import Collection
 from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 
 from app.config import get_settings
+from app.services.embeddings import embedding_dimensions
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+T = TypeVar("T")
+
+_FIELD_KEY_RE = re.compile(r"[^a-z0-9]+")
+
 
 def _get_embedding_function() -> Any:
     """Return OpenAI embedding function if API key available, else None (uses default)."""
@@ -23,6 +37,7 @@ def _get_embedding_function() -> Any:
         return OpenAIEmbeddingFunction(
             api_key=settings.OPENAI_API_KEY,
             model_name=settings.EMBEDDING_MODEL,
+            dimensions=embedding_dimensions(),
         )
     logger.warning(
         "OPENAI_API_KEY not set — ChromaDB will use its default embedding function. "
@@ -31,20 +46,81 @@ def _get_embedding_function() -> Any:
     return None
 
 
-def get_chroma_client() -> chromadb.HttpClient:
-    return chromadb.HttpClient(
-        host=settings.CHROMA_HOST,
-        port=settings.CHROMA_PORT,
-    )
+# Process-wide registry: one HttpClient and one handle per collection,
+# created on first use (or by init_chroma) and dropped by reset_chroma()
+# after a failure so the next call reconnects.
+_lock = threading.Lock()
+_client: Optional[ClientAPI] = None
+_embedding_function: Any = None
+_collections: dict[str, Collection] = {}
+
+
+def get_chroma_client() -> ClientAPI:
+    global _client
+    with _lock:
+        if _client is None:
+            _client = chromadb.HttpClient(
+                host=settings.CHROMA_HOST,
+                port=settings.CHROMA_PORT,
+            )
+        return _client
 
 
-def get_papers_collection() -> chromadb.Collection:
+def get_collection(name: str) -> Collection:
+    """Return the cached handle for a collection, creating it on first use."""
+    global _embedding_function
+    collection = _collections.get(name)
+    if collection is not None:
+        return collection
     client = get_chroma_client()
-    ef = _get_embedding_function()
-    kwargs: dict[str, Any] = {"name": settings.CHROMA_COLLECTION_RESEARCH}
-    if ef:
-        kwargs["embedding_function"] = ef
-    return client.get_or_create_collection(**kwargs)
+    with _lock:
+        if name not in _collections:
+            if _embedding_function is None:
+                _embedding_function = _get_embedding_function() or False
+            kwargs: dict[str, Any] = {"name": name}
+            if _embedding_function:
+                kwargs["embedding_function"] = _embedding_function
+            _collections[name] = client.get_or_create_collection(**kwargs)
+        return _collections[name]
+
+
+def get_papers_collection() -> Collection:
+    return get_collection(settings.CHROMA_COLLECTION_RESEARCH)
+
+
+def get_documents_collection() -> Collection:
+    return get_collection(settings.CHROMA_COLLECTION_DOCUMENTS)
+
+
+def reset_chroma() -> None:
+    """Forget the cached client and collection handles (next call reconnects)."""
+    global _client
+    with _lock:
+        _client = None
+        _collections.clear()
+
+
+def init_chroma() -> bool:
+    """Connect and open the research and documents collections (startup warm-up)."""
+    try:
+        get_papers_collection()
+        get_documents_collection()
+        return True
+    except Exception as exc:
+        reset_chroma()
+        logger.warning("ChromaDB not reachable at startup, will connect lazily: %s", exc)
+        return False
+
+
+def _run(operation: Callable[[Collection], T], name: Optional[str] = None) -> T:
+    """Run `operation` on a cached collection, reconnecting once if it fails."""
+    name = name or settings.CHROMA_COLLECTION_RESEARCH
+    try:
+        return operation(get_collection(name))
+    except Exception as exc:
+        logger.warning("ChromaDB call failed, reconnecting: %s", exc)
+        reset_chroma()
+        return operation(get_collection(name))
 
 
 def upsert_paper(
@@ -54,36 +130,134 @@ def upsert_paper(
     metadata: dict,
 ) -> None:
     """Store or update a paper embedding in ChromaDB."""
+    upsert_papers([
+        {"chroma_id": chroma_id, "title": title, "abstract": abstract, "metadata": metadata}
+    ])
+
+
+def paper_document(title: str, abstract: Optional[str]) -> str:
+    """Text stored (and embedded) for a paper."""
+    return f"{title}\n\n{abstract or ''}"
+
+
+def upsert_papers(
+    items: list[dict],
+    embeddings: Optional[list[list[float]]] = None,
+    collection: Optional[str] = None,
+) -> bool:
+    """
+    Store or update many paper embeddings in one ChromaDB request.
+    Items are {chroma_id, title, abstract, metadata}. Pass precomputed
+    `embeddings` (see embeddings.embed_documents) to skip the collection's
+    embedding function. Returns True on success.
+    """
+    if not items:
+        return True
     try:
-        collection = get_papers_collection()
-        document_text = f"{title}\n\n{abstract or ''}"
-        collection.upsert(
-            ids=[chroma_id],
-            documents=[document_text],
-            metadatas=[metadata],
-        )
+        _run(lambda c: c.upsert(
+            ids=[item["chroma_id"] for item in items],
+            documents=[paper_document(item["title"], item["abstract"]) for item in items],
+            metadatas=[item["metadata"] for item in items],
+            embeddings=embeddings,
+        ), collection)
+        return True
     except Exception as exc:
-        logger.error("ChromaDB upsert failed for %s: %s", chroma_id, exc)
+        logger.error("ChromaDB batch upsert failed (%d papers): %s", len(items), exc)
+        return False
+
+
+def tenant_collection_name(owner_id: Any) -> str:
+    """Per-user research collection used when CHROMA_TENANT_COLLECTIONS is on."""
+    return f"{settings.CHROMA_COLLECTION_RESEARCH}_u_{str(owner_id).replace('-', '')}"
+
+
+def field_key(tag: str) -> str:
+    """Metadata key flagging a field of study ('Computer Science' -> 'field_computer_science')."""
+    return "field_" + _FIELD_KEY_RE.sub("_", tag.lower()).strip("_")
+
+
+def field_flags(tags: list[str]) -> dict[str, bool]:
+    """Chroma metadata cannot hold lists, so each field tag becomes a boolean key."""
+    return {field_key(tag): True for tag in tags if tag and tag.strip()}
+
+
+def paper_filter(
+    paper_ids: Optional[list[str]] = None,
+    field: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    source: Optional[str] = None,
+) -> Optional[dict]:
+    """Build a Chroma `where` clause from the search filters (None if unfiltered)."""
+    clauses: list[dict] = []
+    if paper_ids is not None:
+        clauses.append({"paper_id": {"$in": paper_ids}})
+    if field:
+        clauses.append({field_key(field): True})
+    if year_from is not None:
+        clauses.append({"year": {"$gte": year_from}})
+    if year_to is not None:
+        clauses.append({"year": {"$lte": year_to}})
+    if source:
+        clauses.append({"source": source})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def copy_papers(chroma_ids: list[str], target: str, source: Optional[str] = None) -> bool:
+    """
+    Copy stored vectors (with documents and metadata) from the shared research
+    collection (or `source`) into `target` without re-embedding. Returns True
+    on success.
+    """
+    if not chroma_ids:
+        return True
+    try:
+        stored = _run(lambda collection: collection.get(
+            ids=chroma_ids, include=["embeddings", "documents", "metadatas"]
+        ), source)
+        if stored["ids"]:
+            _run(
+                lambda collection: collection.upsert(
+                    ids=stored["ids"],
+                    embeddings=stored["embeddings"],
+                    documents=stored["documents"],
+                    metadatas=stored["metadatas"],
+                ),
+                target,
+            )
+        return True
+    except Exception as exc:
+        logger.error("ChromaDB copy into %s failed (%d papers): %s", target, len(chroma_ids), exc)
+        return False
 
 
 def search_papers(
     query: str,
     n_results: int = 10,
     where: Optional[dict] = None,
+    collection: Optional[str] = None,
+    query_embedding: Optional[list[float]] = None,
 ) -> list[dict]:
     """
-    Semantic search over indexed papers.
+    Semantic search over indexed papers, optionally restricted by a `where`
+    filter (see paper_filter) and run against a non-default collection.
+    Pass `query_embedding` (see embeddings.embed_query) to skip embedding
+    the query text on this call.
     Returns list of {id, distance, metadata} dicts.
     """
     try:
-        collection = get_papers_collection()
-        kwargs: dict[str, Any] = {
-            "query_texts": [query],
-            "n_results": min(n_results, collection.count() or 1),
-        }
+        # No count() round trip to clamp n_results: the server already caps it
+        # at the collection size, and an empty collection returns no hits.
+        kwargs: dict[str, Any] = {"n_results": max(n_results, 1)}
+        if query_embedding is not None:
+            kwargs["query_embeddings"] = [query_embedding]
+        else:
+            kwargs["query_texts"] = [query]
         if where:
             kwargs["where"] = where
-        results = collection.query(**kwargs)
+        results = _run(lambda c: c.query(**kwargs), collection)
         output = []
         ids = results.get("ids", [[]])[0]
         distances = results.get("distances", [[]])[0]
@@ -98,9 +272,40 @@ def search_papers(
         return []
 
 
-def delete_paper(chroma_id: str) -> None:
+def list_ids(offset: int, limit: int, collection: Optional[str] = None) -> list[str]:
+    """One page of stored ids (for scans such as reconciliation). Raises on failure."""
+    return _run(lambda c: c.get(include=[], offset=offset, limit=limit), collection)["ids"]
+
+
+def existing_ids(ids: list[str], collection: Optional[str] = None) -> set[str]:
+    """Which of `ids` are stored. Raises on failure."""
+    if not ids:
+        return set()
+    return set(_run(lambda c: c.get(ids=ids, include=[]), collection)["ids"])
+
+
+def delete_papers(ids: list[str], collection: Optional[str] = None) -> None:
+    """Delete many ids in one request. Raises on failure."""
+    if ids:
+        _run(lambda c: c.delete(ids=ids), collection)
+
+
+def clear_collection(name: str) -> None:
+    """
+    Delete a collection so its next use recreates it empty, with no embedding
+    dimension fixed yet. Other processes' handles fail once and reconnect.
+    Raises on failure.
+    """
+    try:
+        get_chroma_client().delete_collection(name)
+    except ValueError:
+        pass  # never created
+    with _lock:
+        _collections.pop(name, None)
+
+
+def delete_paper(chroma_id: str, collection: Optional[str] = None) -> None:
     try:
-        collection = get_papers_collection()
-        collection.delete(ids=[chroma_id])
+        _run(lambda c: c.delete(ids=[chroma_id]), collection)
     except Exception as exc:
         logger.error("ChromaDB delete failed for %s: %s", chroma_id, exc)
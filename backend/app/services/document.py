@@ -7,10 +7,10 @@ formats APA/IEEE citations, and exports to DOCX.
 
 import io
 import logging
+import time
 from datetime import datetime, timezone
 from typing import Optional
 
-import anthropic
 from docx import Document as DocxDocument
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
@@ -19,10 +19,14 @@ from docx.shared import Pt, RGBColor
 from app.config import get_settings
 from app.models.document import AcademicDocument
 from app.models.paper import Paper
+from app.services.llm import get_llm_client, record_usage
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Rough characters per token of English prose, to size prompts without an API call
+_CHARS_PER_TOKEN = 4
+
 # ---------------------------------------------------------------------------
 # Section definitions per academic field
 # ---------------------------------------------------------------------------
@@ -164,6 +168,26 @@ def _build_system_prompt(project_title: str, field: str, papers: list[Paper]) ->
     )
 
 
+def build_document_context(project_title: str, field: str, papers: list[Paper]) -> list[dict]:
+    """
+    System prompt shared by every section of a document, as Messages API
+    content blocks. Build it once per document and pass it to each
+    generate_section call: an identical prefix is what lets the provider serve
+    later sections from its prompt cache. The block is marked for caching only
+    when it reaches PROMPT_CACHE_MIN_TOKENS, since shorter prompts are never cached.
+    """
+    text = _build_system_prompt(project_title, field, papers)
+    block: dict = {"type": "text", "text": text}
+    if len(text) // _CHARS_PER_TOKEN >= settings.PROMPT_CACHE_MIN_TOKENS:
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+def is_cacheable(context: list[dict]) -> bool:
+    """Whether a document context is marked for prompt caching."""
+    return any("cache_control" in block for block in context)
+
+
 async def generate_section(
     document: AcademicDocument,
     section_name: str,
@@ -171,15 +195,19 @@ async def generate_section(
     field: str,
     papers: list[Paper],
     extra_context: Optional[str] = None,
+    context: Optional[list[dict]] = None,
 ) -> str:
-    """Call Claude to generate a document section. Returns the generated text."""
+    """
+    Call Claude to generate a document section. Returns the generated text.
+    `context` is the document's prebuilt build_document_context(); it is built
+    from project_title, field and papers when omitted.
+    """
     if not settings.ANTHROPIC_API_KEY:
         return (
             f"[{section_name.replace('_', ' ').title()} — AI generation requires ANTHROPIC_API_KEY]"
         )
 
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    system = _build_system_prompt(project_title, field, papers)
+    system = context if context is not None else build_document_context(project_title, field, papers)
     section_instruction = SECTION_PROMPTS.get(
         section_name,
         f"Write the {section_name.replace('_', ' ')} section (400-600 words).",
@@ -188,12 +216,14 @@ async def generate_section(
     if extra_context:
         user_msg += f"\n\nAdditional context from the student: {extra_context}"
 
-    message = client.messages.create(
+    started = time.perf_counter()
+    message = await get_llm_client().messages.create(
         model=settings.ANTHROPIC_MODEL,
         max_tokens=2048,
         system=system,
         messages=[{"role": "user", "content": user_msg}],
     )
+    await record_usage("document", message.usage, time.perf_counter() - started)
     return message.content[0].text
 
 
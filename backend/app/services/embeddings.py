@@ -0,0 +1,265 @@
+"""
+Embedding service — computes embeddings in our own code instead of through
+Chroma's embedding function, so they can be cached and batched.
+
+Uses OpenAI (EMBEDDING_MODEL / EMBEDDING_DIMENSIONS) when OPENAI_API_KEY is
+set, otherwise Chroma's default local model — the same function the research
+collection is configured with, so query and document vectors always match.
+
+Query embeddings are cached in two tiers keyed by model, dimensions and the
+normalized query text:
+    1. an in-process LRU (EMBEDDING_QUERY_CACHE_SIZE entries)
+    2. Redis, shared by every API process (`embedding:query:<model>:<dims>:<sha1>`),
+       stored as packed float32
+A repeated search therefore skips the provider round trip entirely. Redis
+being unreachable only disables the second tier.
+
+Document embeddings go through EmbeddingBatcher (embed_documents): concurrent
+callers' texts are coalesced into one provider request once
+EMBEDDING_BATCH_MAX_ITEMS items or EMBEDDING_BATCH_MAX_TOKENS tokens are
+queued, or EMBEDDING_BATCH_MAX_WAIT_MS after the first one arrives. Texts are
+measured with tiktoken and truncated to EMBEDDING_MAX_INPUT_TOKENS; each caller
+gets its own vectors back. Batch size, tokens and latency are recorded as
+`embeddings.batch.*` histograms.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Optional
+
+from openai import AsyncOpenAI
+
+from app.config import get_settings
+from app.db.redis import get_redis
+from app.services import metrics
+from app.services.cache import normalize_query
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_openai: Optional[AsyncOpenAI] = None
+_local_function: Any = None
+_query_cache: "OrderedDict[str, list[float]]" = OrderedDict()
+_encoding: Any = None
+_batcher: Optional["EmbeddingBatcher"] = None
+
+# Rough size of a token when the tokenizer cannot be loaded (offline workers)
+_CHARS_PER_TOKEN = 4
+_BATCH_SIZE_BUCKETS: tuple[float, ...] = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+_BATCH_TOKEN_BUCKETS: tuple[float, ...] = (100, 1000, 5000, 10_000, 50_000, 100_000, 300_000)
+
+
+def embedding_dimensions() -> Optional[int]:
+    """Requested output size; only the text-embedding-3 models accept one."""
+    if settings.EMBEDDING_MODEL.startswith("text-embedding-3"):
+        return settings.EMBEDDING_DIMENSIONS
+    return None
+
+
+def model_id() -> str:
+    """Identity of the active embedding space (part of every cache key)."""
+    if not settings.OPENAI_API_KEY:
+        return "chroma-default"
+    return f"{settings.EMBEDDING_MODEL}:{embedding_dimensions() or 'native'}"
+
+
+def _get_openai() -> AsyncOpenAI:
+    global _openai
+    if _openai is None:
+        _openai = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, timeout=settings.HTTP_TIMEOUT_SECONDS)
+    return _openai
+
+
+def _embed_locally(texts: list[str]) -> list[list[float]]:
+    global _local_function
+    if _local_function is None:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+        _local_function = DefaultEmbeddingFunction()
+    return [list(map(float, vector)) for vector in _local_function(texts)]
+
+
+async def embed_texts(texts: list[str]) -> list[list[float]]:
+    """Embed texts with the configured provider (one request, order preserved)."""
+    if not texts:
+        return []
+    # Same preprocessing as Chroma's OpenAIEmbeddingFunction
+    texts = [text.replace("\n", " ") for text in texts]
+    if not settings.OPENAI_API_KEY:
+        return await asyncio.to_thread(_embed_locally, texts)
+    kwargs: dict[str, Any] = {"model": settings.EMBEDDING_MODEL, "input": texts}
+    if embedding_dimensions():
+        kwargs["dimensions"] = embedding_dimensions()
+    response = await _get_openai().embeddings.create(**kwargs)
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def _remember(key: str, vector: list[float]) -> None:
+    _query_cache[key] = vector
+    _query_cache.move_to_end(key)
+    while len(_query_cache) > settings.EMBEDDING_QUERY_CACHE_SIZE:
+        _query_cache.popitem(last=False)
+
+
+async def embed_query(text: str) -> list[float]:
+    """Embedding for a search query, served from the LRU / Redis cache when possible."""
+    digest = hashlib.sha1(normalize_query(text).encode()).hexdigest()
+    key = f"{model_id()}:{digest}"
+
+    vector = _query_cache.get(key)
+    if vector is not None:
+        _query_cache.move_to_end(key)
+        await metrics.incr("embeddings.query_cache.local_hit")
+        return vector
+
+    redis_key = f"embedding:query:{key}"
+    try:
+        raw = await get_redis().get(redis_key)
+    except Exception as exc:
+        logger.debug("Query embedding cache unavailable: %s", exc)
+        raw = None
+    if raw is not None:
+        vector = array("f", raw).tolist()
+        _remember(key, vector)
+        await metrics.incr("embeddings.query_cache.redis_hit")
+        return vector
+
+    await metrics.incr("embeddings.query_cache.miss")
+    vector = (await embed_texts([normalize_query(text)]))[0]
+    _remember(key, vector)
+    try:
+        await get_redis().set(
+            redis_key, array("f", vector).tobytes(), ex=settings.EMBEDDING_QUERY_CACHE_TTL_SECONDS
+        )
+    except Exception as exc:
+        logger.debug("Query embedding cache write failed: %s", exc)
+    return vector
+
+
+def _get_encoding() -> Any:
+    """tiktoken encoding for the embedding model, or False if it cannot be loaded."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            try:
+                _encoding = tiktoken.encoding_for_model(settings.EMBEDDING_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as exc:
+            logger.warning("tiktoken unavailable, estimating token counts: %s", exc)
+            _encoding = False
+    return _encoding
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> tuple[str, int]:
+    """Cut `text` to at most `max_tokens` tokens. Returns (text, token count)."""
+    encoding = _get_encoding()
+    if not encoding:
+        text = text[: max_tokens * _CHARS_PER_TOKEN]
+        return text, max(1, len(text) // _CHARS_PER_TOKEN)
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) > max_tokens:
+        tokens = tokens[:max_tokens]
+        text = encoding.decode(tokens)
+    return text, max(1, len(tokens))
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embed requests into provider-sized batches.
+
+    Bound to the event loop it is first used on; get_batcher() returns the
+    batcher for the running loop.
+    """
+
+    def __init__(self, max_items: int, max_tokens: int, max_wait_ms: float) -> None:
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.max_wait = max_wait_ms / 1000
+        self.loop = asyncio.get_running_loop()
+        self._pending: list[tuple[str, int, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._first_queued = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """Queue texts for embedding and wait for their vectors (input order)."""
+        futures = []
+        for text in texts:
+            text, tokens = truncate_to_tokens(text, settings.EMBEDDING_MAX_INPUT_TOKENS)
+            if self._pending and self._pending_tokens + tokens > self.max_tokens:
+                self._flush()
+            if not self._pending:
+                self._first_queued = time.perf_counter()
+            future = self.loop.create_future()
+            self._pending.append((text, tokens, future))
+            self._pending_tokens += tokens
+            futures.append(future)
+            if len(self._pending) >= self.max_items:
+                self._flush()
+        if self._pending and self._timer is None:
+            self._timer = self.loop.call_later(self.max_wait, self._flush)
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, tokens = self._pending, self._pending_tokens
+        self._pending, self._pending_tokens = [], 0
+        if batch:
+            task = self.loop.create_task(self._send(batch, tokens, self._first_queued))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: list[tuple[str, int, asyncio.Future]], tokens: int, queued_at: float) -> None:
+        started = time.perf_counter()
+        try:
+            vectors = await embed_texts([text for text, _, _ in batch])
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, _, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+        finished = time.perf_counter()
+        await metrics.observe("embeddings.batch.size", len(batch), buckets=_BATCH_SIZE_BUCKETS)
+        await metrics.observe("embeddings.batch.tokens", tokens, buckets=_BATCH_TOKEN_BUCKETS)
+        await metrics.observe("embeddings.batch.queue_seconds", started - queued_at)
+        await metrics.observe("embeddings.batch.latency_seconds", finished - started)
+
+
+def get_batcher() -> EmbeddingBatcher:
+    """The process-wide batcher for the running event loop."""
+    global _batcher
+    if _batcher is None or _batcher.loop is not asyncio.get_running_loop():
+        _batcher = EmbeddingBatcher(
+            max_items=settings.EMBEDDING_BATCH_MAX_ITEMS,
+            max_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+            max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+        )
+    return _batcher
+
+
+async def embed_documents(texts: list[str]) -> list[list[float]]:
+    """Embed document texts through the shared micro-batcher."""
+    if not texts:
+        return []
+    return await get_batcher().embed(texts)
+
+
+async def close_embeddings() -> None:
+    """Close the OpenAI client's connection pool (call on process shutdown)."""
+    global _openai
+    if _openai is not None:
+        await _openai.close()
+        _openai = None
@@ -0,0 +1,80 @@
+"""
+Shared outbound HTTP client pool.
+
+Keeps one long-lived httpx.AsyncClient per upstream host so DNS, TCP and TLS
+setup is paid once per process instead of once per request. Each host gets its
+own connection limits and keep-alive pool.
+
+The API opens the pool in main.lifespan; Celery workers open it at worker
+process init (see app.tasks.celery_app). get_http_client() also creates a
+client lazily, so scripts and tests work without explicit initialisation.
+"""
+
+import importlib.util
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_USER_AGENT = "MiningAI/0.1"
+
+# host (netloc) -> pooled client
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 is opt-in and needs the optional `h2` package."""
+    if not settings.HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the `h2` package is missing — using HTTP/1.1")
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS),
+        limits=limits,
+        http2=_http2_enabled(),
+        follow_redirects=True,
+        headers={"User-Agent": _USER_AGENT},
+    )
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """Return the pooled client for the host of `url`, creating it on first use."""
+    host = urlsplit(url).netloc
+    client = _clients.get(host)
+    if client is None or client.is_closed:
+        client = _build_client()
+        _clients[host] = client
+    return client
+
+
+def init_http_clients(*urls: str) -> None:
+    """Eagerly create pooled clients for the given upstream base URLs."""
+    for url in urls:
+        get_http_client(url)
+    logger.info("HTTP client pool ready for %s", ", ".join(sorted(_clients)) or "no hosts")
+
+
+async def close_http_clients() -> None:
+    """Close every pooled client (call on process shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as exc:
+            logger.warning("Error closing HTTP client: %s", exc)
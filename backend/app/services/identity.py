@@ -0,0 +1,136 @@
+"""
+Paper identity resolution — decides when two paper records are the same work.
+
+A paper's fingerprints are, in order of strength:
+    doi:<normalized DOI>
+    arxiv:<arXiv ID without version>
+    title:<sha1 of normalized title + year>
+
+Records sharing any fingerprint describe the same paper, so a Semantic Scholar
+hit carrying an ArXiv external ID merges with the arXiv Atom entry for it even
+though the latter has no DOI. merge_duplicates() collapses a batch before it
+is persisted; the same fingerprints are stored on Paper (doi, arxiv_id,
+title_fingerprint — all indexed) so papers already in the store can be
+matched without an upsert or a second embedding.
+"""
+
+import hashlib
+import re
+from typing import Optional
+
+_ARXIV_VERSION_RE = re.compile(r"v\d+$")
+# Old-style ids with a subject class ('cs.AI/0001001'); arXiv's own ids omit it
+_ARXIV_SUBJECT_CLASS_RE = re.compile(r"^([a-z-]+)\.[a-z-]+/(\d{7})", re.IGNORECASE)
+_TITLE_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_doi(doi: str) -> str:
+    """Strip whitespace and resolver prefixes; DOIs compare case-insensitively."""
+    doi = doi.strip()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "doi:"):
+        if doi.lower().startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi.lower()
+
+
+def normalize_arxiv_id(arxiv_id: str) -> str:
+    """
+    Strip abs/ URL prefixes, the version suffix and an old-style subject class,
+    giving the form of arXiv's Atom ids ('2301.00001v2' -> '2301.00001',
+    'cs.AI/0001001' -> 'cs/0001001').
+    """
+    arxiv_id = arxiv_id.strip()
+    for prefix in ("https://arxiv.org/abs/", "http://arxiv.org/abs/", "arxiv:"):
+        if arxiv_id.lower().startswith(prefix):
+            arxiv_id = arxiv_id[len(prefix):]
+    arxiv_id = _ARXIV_SUBJECT_CLASS_RE.sub(lambda m: f"{m[1].lower()}/{m[2]}", arxiv_id)
+    return _ARXIV_VERSION_RE.sub("", arxiv_id)
+
+
+def title_fingerprint(title: Optional[str], year: Optional[int]) -> Optional[str]:
+    """sha1 of the lowercased alphanumeric words of the title plus the year."""
+    words = _TITLE_NORMALIZE_RE.sub(" ", (title or "").lower()).strip()
+    if not words or words == "untitled":
+        return None
+    return hashlib.sha1(f"{words}|{year or ''}".encode()).hexdigest()
+
+
+def fingerprints(paper: dict) -> list[str]:
+    """Every identity key of a paper, strongest first."""
+    keys = []
+    if paper.get("doi"):
+        keys.append(f"doi:{normalize_doi(paper['doi'])}")
+    if paper.get("arxiv_id"):
+        keys.append(f"arxiv:{normalize_arxiv_id(paper['arxiv_id'])}")
+    fingerprint = title_fingerprint(paper.get("title"), paper.get("year"))
+    if fingerprint:
+        keys.append(f"title:{fingerprint}")
+    return keys
+
+
+def canonical_key(paper: dict) -> str:
+    """The strongest fingerprint (untitled records without IDs fall back to a content hash)."""
+    keys = fingerprints(paper)
+    if keys:
+        return keys[0]
+    return f"record:{hashlib.sha1(repr(sorted(paper.items())).encode()).hexdigest()}"
+
+
+def _merge_into(base: dict, other: dict) -> None:
+    """Fill gaps in `base` from `other` (first-seen record wins on conflicts)."""
+    for key, value in other.items():
+        current = base.get(key)
+        if current in (None, "", [], "Untitled"):
+            base[key] = value
+    if len(other.get("abstract") or "") > len(base.get("abstract") or ""):
+        base["abstract"] = other["abstract"]
+    base["citations_count"] = max(base.get("citations_count") or 0, other.get("citations_count") or 0)
+
+
+def _strong_ids(paper: dict) -> dict[str, str]:
+    return {key.split(":", 1)[0]: key for key in fingerprints(paper) if not key.startswith("title:")}
+
+
+def merge_duplicates(papers: list[dict]) -> tuple[list[dict], list[int]]:
+    """
+    Collapse records sharing a fingerprint; conflicting DOIs or arXiv IDs never merge.
+    Returns (merged, index) with index[i] the position in merged of papers[i].
+    """
+    parent = list(range(len(papers)))
+    strong = [_strong_ids(paper) for paper in papers]
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: dict[str, int] = {}
+    for i, paper in enumerate(papers):
+        # ID-less records join on their content hash, which is their canonical key
+        for key in fingerprints(paper) or [canonical_key(paper)]:
+            if key not in owner:
+                owner[key] = i
+                continue
+            a, b = find(owner[key]), find(i)
+            if a == b:
+                continue
+            if not key.startswith("doi:") and any(strong[a].get(k, v) != v for k, v in strong[b].items()):
+                continue
+            # Roots are always the lowest index, so groups keep first-seen order
+            root, child = min(a, b), max(a, b)
+            parent[child] = root
+            strong[root] = {**strong[child], **strong[root]}
+
+    merged: list[dict] = []
+    slot: dict[int, int] = {}
+    index: list[int] = []
+    for i, paper in enumerate(papers):
+        root = find(i)
+        if root not in slot:
+            slot[root] = len(merged)
+            merged.append(dict(paper))
+        else:
+            _merge_into(merged[slot[root]], paper)
+        index.append(slot[root])
+    return merged, index
@@ -0,0 +1,81 @@
+"""
+Shared Anthropic client.
+
+Keeps one anthropic.AsyncAnthropic per process with its own pooled httpx
+client (LLM_MAX_CONNECTIONS, keep-alive), so document and prototype
+generation await Claude without blocking the event loop and reuse TLS
+connections across calls. Requests time out after LLM_TIMEOUT_SECONDS
+(LLM_CONNECT_TIMEOUT_SECONDS to connect) and are retried LLM_MAX_RETRIES
+times by the SDK.
+
+Token usage of every call is recorded as `llm.<operation>.*` counters —
+including prompt-cache reads and writes — with its latency as the
+`llm.<operation>.latency_seconds` histogram.
+
+It is opened and closed alongside the HTTP pool (see services.http);
+anything else gets it on first use of get_llm_client().
+"""
+
+import logging
+from typing import Any, Optional
+
+import anthropic
+import httpx
+
+from app.config import get_settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_client: Optional[anthropic.AsyncAnthropic] = None
+
+# Generation takes seconds to minutes, past metrics.DEFAULT_BUCKETS
+_LATENCY_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+def _build_client() -> anthropic.AsyncAnthropic:
+    return anthropic.AsyncAnthropic(
+        api_key=settings.ANTHROPIC_API_KEY,
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS),
+        max_retries=settings.LLM_MAX_RETRIES,
+        http_client=anthropic.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        ),
+    )
+
+
+def init_llm_client() -> None:
+    """Create the process-wide client (no-op without ANTHROPIC_API_KEY)."""
+    global _client
+    if settings.ANTHROPIC_API_KEY and _client is None:
+        _client = _build_client()
+
+
+def get_llm_client() -> anthropic.AsyncAnthropic:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed():
+        _client = _build_client()
+    return _client
+
+
+async def close_llm_client() -> None:
+    """Close the client's connection pool (call on process shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def record_usage(operation: str, usage: Any, seconds: float) -> None:
+    """Record a response's token usage and the request latency."""
+    for field in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+        tokens = getattr(usage, field, None)
+        if tokens:
+            await metrics.incr(f"llm.{operation}.{field}", tokens)
+    await metrics.observe(f"llm.{operation}.latency_seconds", seconds, _LATENCY_BUCKETS)
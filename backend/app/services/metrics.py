@@ -0,0 +1,86 @@
+"""
+Metrics service — cluster-wide counters, gauges and histograms in Redis.
+
+Every API process and Celery worker writes to the same Redis hashes, so
+GET /metrics shows totals for the whole deployment. Recording a metric must
+never break the caller: Redis errors are logged at debug level and ignored.
+
+Layout:
+    metrics:counters          hash  name -> int
+    metrics:gauges            hash  name -> float
+    metrics:hist:<name>       hash  le_<bucket> / le_inf / sum / count
+"""
+
+import logging
+from collections.abc import Sequence
+
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS_KEY = "metrics:counters"
+_GAUGES_KEY = "metrics:gauges"
+_HIST_PREFIX = "metrics:hist:"
+
+# Seconds — suits upstream HTTP, embedding and queueing latencies
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+async def incr(name: str, amount: int = 1) -> None:
+    """Increment a counter."""
+    try:
+        await get_redis().hincrby(_COUNTERS_KEY, name, amount)
+    except Exception as exc:
+        logger.debug("metrics.incr(%s) failed: %s", name, exc)
+
+
+async def set_gauge(name: str, value: float) -> None:
+    """Set a gauge to its latest value."""
+    try:
+        await get_redis().hset(_GAUGES_KEY, name, value)
+    except Exception as exc:
+        logger.debug("metrics.set_gauge(%s) failed: %s", name, exc)
+
+
+async def observe(name: str, value: float, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+    """Record one observation in a cumulative histogram."""
+    key = f"{_HIST_PREFIX}{name}"
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for bound in buckets:
+            if value <= bound:
+                pipe.hincrby(key, f"le_{bound:g}", 1)
+        pipe.hincrby(key, "le_inf", 1)
+        pipe.hincrbyfloat(key, "sum", value)
+        pipe.hincrby(key, "count", 1)
+        await pipe.execute()
+    except Exception as exc:
+        logger.debug("metrics.observe(%s) failed: %s", name, exc)
+
+
+def _decode(raw: dict) -> dict[str, float]:
+    return {k.decode(): float(v) for k, v in raw.items()}
+
+
+async def snapshot() -> dict:
+    """
+    Return every recorded metric as {counters, gauges, histograms}. If Redis
+    fails part-way, whatever was read so far is returned (possibly empty).
+    """
+    counters: dict[str, float] = {}
+    gauges: dict[str, float] = {}
+    histograms: dict[str, dict[str, float]] = {}
+    try:
+        redis = get_redis()
+        counters = _decode(await redis.hgetall(_COUNTERS_KEY))
+        gauges = _decode(await redis.hgetall(_GAUGES_KEY))
+        async for key in redis.scan_iter(match=f"{_HIST_PREFIX}*", count=100):
+            name = key.decode()[len(_HIST_PREFIX):]
+            histograms[name] = _decode(await redis.hgetall(key))
+    except Exception as exc:
+        logger.warning("metrics.snapshot failed, returning partial metrics: %s", exc)
+    return {
+        "counters": {k: int(v) for k, v in sorted(counters.items())},
+        "gauges": dict(sorted(gauges.items())),
+        "histograms": dict(sorted(histograms.items())),
+    }
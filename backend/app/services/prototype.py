@@ -6,11 +6,11 @@ based on the prototype type and user description.
 """
 
 import logging
-
-import anthropic
+import time
 
 from app.config import get_settings
 from app.models.prototype import Prototype
+from app.services.llm import get_llm_client, record_usage
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -113,13 +113,14 @@ async def generate_prototype_code(prototype: Prototype) -> tuple[str, str]:
         f"Task: {type_prompt}"
     )
 
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    message = client.messages.create(
+    started = time.perf_counter()
+    message = await get_llm_client().messages.create(
         model=settings.ANTHROPIC_MODEL,
         max_tokens=4096,
         system=_SYSTEM_PROMPT,
         messages=[{"role": "user", "content": user_message}],
     )
+    await record_usage("prototype", message.usage, time.perf_counter() - started)
     code = message.content[0].text.strip()
 
     # Strip accidental markdown fences
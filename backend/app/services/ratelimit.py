@@ -0,0 +1,184 @@
+"""
+Distributed rate limiter for external academic APIs.
+
+A Redis-backed token bucket (implemented as GCRA) per provider, shared by
+every API process and Celery worker so the whole cluster stays under each
+provider's quota. acquire() reserves the caller's slot atomically and then
+sleeps until it is due: slots are handed out in arrival order, so waiting
+callers are served first-come first-served instead of racing each other.
+
+A caller with a deadline (max_wait, or an enclosing deadline() block) is
+refused with RateLimited instead of reserving a slot it could not use in
+time, and a caller cancelled while waiting gives back its slot if nobody has
+reserved after it, so abandoned requests do not push everyone else back.
+
+When a provider answers 429 (or 503) with Retry-After, penalize() blocks the
+bucket cluster-wide until that time, so nobody retries early.
+
+Redis being unreachable fails open: calls proceed without throttling.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from app.config import get_settings
+from app.db.redis import get_redis
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# KEYS: tat, blocked_until    ARGV: interval_ms, burst, max_wait_ms (-1 = no limit)
+# Returns {milliseconds the caller must wait, new tat}; a tat of 0 means the
+# wait exceeded max_wait_ms and no slot was reserved.
+_RESERVE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local blocked = tonumber(redis.call('GET', KEYS[2]) or 0)
+local allow_at = math.max(tat - (burst - 1) * interval, blocked)
+local wait = math.max(allow_at - now, 0)
+if max_wait >= 0 and wait > max_wait then
+    return {wait, 0}
+end
+local new_tat = math.max(tat, allow_at) + interval
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now + 1000)
+return {wait, new_tat}
+"""
+
+# KEYS: tat    ARGV: reserved tat, interval_ms
+# Gives back a slot, provided no later reservation was stacked on top of it.
+_REFUND = """
+if tonumber(redis.call('GET', KEYS[1]) or 0) == tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[1], tonumber(ARGV[1]) - tonumber(ARGV[2]), 'KEEPTTL')
+    return 1
+end
+return 0
+"""
+
+# KEYS: blocked_until    ARGV: delay_ms
+_PENALIZE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local until_ms = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('GET', KEYS[1]) or 0)
+if until_ms > current then
+    redis.call('SET', KEYS[1], until_ms, 'PX', tonumber(ARGV[1]) + 1000)
+end
+return until_ms
+"""
+
+
+# Monotonic time by which the current task must have sent its request (see deadline())
+_deadline: ContextVar[Optional[float]] = ContextVar("ratelimit_deadline", default=None)
+
+
+class RateLimited(Exception):
+    """The provider's next free slot is further away than the caller can wait."""
+
+    def __init__(self, provider: str, wait: float) -> None:
+        super().__init__(f"{provider} rate limit: next request slot in {wait:.1f}s")
+        self.provider = provider
+        self.wait = wait
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """acquire() calls inside the block raise RateLimited rather than wait past `seconds` from now."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _limits(provider: str) -> tuple[float, int]:
+    """(requests per second, burst) for a provider."""
+    if provider == "semantic_scholar":
+        return settings.RATE_LIMIT_SEMANTIC_SCHOLAR_PER_SECOND, settings.RATE_LIMIT_SEMANTIC_SCHOLAR_BURST
+    if provider == "arxiv":
+        return settings.RATE_LIMIT_ARXIV_PER_SECOND, settings.RATE_LIMIT_ARXIV_BURST
+    raise ValueError(f"No rate limit configured for provider '{provider}'")
+
+
+async def acquire(provider: str, max_wait: Optional[float] = None) -> float:
+    """
+    Wait until this caller may send one request to `provider`.
+    Raises RateLimited, without reserving a slot, if that is more than
+    `max_wait` seconds away (default: the time left in the enclosing deadline()).
+    Returns the seconds spent waiting (also recorded as a histogram).
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return 0.0
+    if max_wait is None and (until := _deadline.get()) is not None:
+        max_wait = until - time.monotonic()
+    rate, burst = _limits(provider)
+    interval_ms = max(int(1000 / rate), 1)
+    tat_key = f"ratelimit:{provider}:tat"
+    try:
+        wait_ms, reserved = await get_redis().eval(
+            _RESERVE,
+            2,
+            tat_key,
+            f"ratelimit:{provider}:blocked_until",
+            interval_ms,
+            max(burst, 1),
+            -1 if max_wait is None else max(int(max_wait * 1000), 0),
+        )
+    except Exception as exc:
+        logger.debug("Rate limiter unavailable for %s, proceeding: %s", provider, exc)
+        return 0.0
+
+    wait = int(wait_ms) / 1000
+    if not int(reserved):
+        await metrics.incr(f"ratelimit.{provider}.refused")
+        raise RateLimited(provider, wait)
+    if wait > 0:
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            try:
+                await get_redis().eval(_REFUND, 1, tat_key, int(reserved), interval_ms)
+            except Exception as exc:
+                logger.debug("Rate limiter refund failed for %s: %s", provider, exc)
+            raise
+    await metrics.observe(f"ratelimit.{provider}.wait_seconds", wait)
+    return wait
+
+
+async def penalize(provider: str, delay: float) -> None:
+    """Block `provider` for every caller in the cluster for `delay` seconds."""
+    await metrics.incr(f"ratelimit.{provider}.throttled")
+    try:
+        await get_redis().eval(
+            _PENALIZE, 1, f"ratelimit:{provider}:blocked_until", int(delay * 1000)
+        )
+    except Exception as exc:
+        logger.debug("Rate limiter penalize failed for %s: %s", provider, exc)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(retry_at.timestamp() - time.time(), 0.0)
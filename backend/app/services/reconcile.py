@@ -0,0 +1,180 @@
+"""
+Reconcile — repairs drift between the papers table and the research collection.
+
+Two paged scans, RECONCILE_PAGE_SIZE ids at a time:
+    1. papers → vectors: keyset-paged ids of papers marked 'indexed' are
+       looked up in the vector store; papers without a vector are re-embedded
+       through the batched path (REINDEX_BATCH_SIZE at a time). Pending and
+       failed papers are left to the write-behind indexer.
+    2. vectors → papers: the collection's ids are paged and looked up in
+       PostgreSQL; ids with no paper row are orphans.
+
+With CHROMA_TENANT_COLLECTIONS a third scan pages the library links of
+indexed papers and copies any vector missing from the owner's tenant
+collection out of the research collection (no re-embedding). This also
+backfills tenant collections after the setting is turned on.
+
+An orphan is only purged if it was also an orphan in the previous run, so
+a vector written by a transaction that had not committed when the scan ran
+is never deleted. Candidates are kept in Redis
+(`vector_store:reconcile:<collection>:orphans`) until the next run.
+
+Drift is reported as gauges (reconcile.missing, reconcile.orphaned) and
+counters (reconcile.reembedded, reconcile.purged, reconcile.tenant_copied).
+Runs are skipped while a reindex job holds its lock; a checkpoint left by
+a failed job does not block them. Tenant collections are not scanned for
+orphans: remove_from_library deletes them.
+"""
+
+import logging
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.db.redis import get_redis
+from app.models.paper import Paper, UserPaper
+from app.services import metrics, reindex, vector_store
+from app.services.research import index_papers, mark_indexed
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Orphan candidates older than this are forgotten rather than purged
+_CANDIDATE_TTL_SECONDS = 7 * 24 * 3600
+_LOCK_SECONDS = 3600
+
+
+async def _reembed_missing(db: AsyncSession, collection: str) -> tuple[int, int]:
+    """Index papers that have no vector. Returns (missing, re-embedded)."""
+    missing = reembedded = 0
+    last_id = None
+    while True:
+        stmt = (
+            select(Paper.id)
+            .where(Paper.index_status == "indexed")
+            .order_by(Paper.id)
+            .limit(settings.RECONCILE_PAGE_SIZE)
+        )
+        if last_id is not None:
+            stmt = stmt.where(Paper.id > last_id)
+        page = (await db.scalars(stmt)).all()
+        if not page:
+            return missing, reembedded
+        last_id = page[-1]
+
+        stored = await vector_store.existing_ids([str(pid) for pid in page], collection)
+        absent = [pid for pid in page if str(pid) not in stored]
+        missing += len(absent)
+        for start in range(0, len(absent), settings.REINDEX_BATCH_SIZE):
+            chunk = absent[start:start + settings.REINDEX_BATCH_SIZE]
+            papers = list((await db.scalars(select(Paper).where(Paper.id.in_(chunk)))).all())
+            if papers and await index_papers(papers, collection):
+                await mark_indexed(db, [p.id for p in papers])
+                reembedded += len(papers)
+            await db.commit()
+            db.expunge_all()
+
+
+async def _find_orphans(db: AsyncSession, collection: str) -> set[str]:
+    """Vector ids with no paper row."""
+    orphans: set[str] = set()
+    offset = 0
+    while True:
+        page = await vector_store.list_ids(offset, settings.RECONCILE_PAGE_SIZE, collection)
+        if not page:
+            return orphans
+        offset += len(page)
+
+        paper_ids = []
+        for chroma_id in page:
+            try:
+                paper_ids.append(uuid.UUID(chroma_id))
+            except ValueError:
+                orphans.add(chroma_id)
+        known = {str(pid) for pid in (await db.scalars(select(Paper.id).where(Paper.id.in_(paper_ids)))).all()}
+        orphans.update(str(pid) for pid in paper_ids if str(pid) not in known)
+
+
+async def _copy_missing_tenant_vectors(db: AsyncSession) -> int:
+    """Copy indexed library papers missing from their owner's tenant collection. Returns the number copied."""
+    copied = 0
+    last_id = None
+    while True:
+        stmt = (
+            select(UserPaper.id, UserPaper.user_id, UserPaper.paper_id)
+            .join(Paper, Paper.id == UserPaper.paper_id)
+            .where(Paper.index_status == "indexed")
+            .order_by(UserPaper.id)
+            .limit(settings.RECONCILE_PAGE_SIZE)
+        )
+        if last_id is not None:
+            stmt = stmt.where(UserPaper.id > last_id)
+        page = (await db.execute(stmt)).all()
+        if not page:
+            return copied
+        last_id = page[-1].id
+
+        by_owner: dict[uuid.UUID, list[str]] = {}
+        for _, user_id, paper_id in page:
+            by_owner.setdefault(user_id, []).append(str(paper_id))
+        for user_id, ids in by_owner.items():
+            tenant = vector_store.tenant_collection_name(user_id)
+            stored = await vector_store.existing_ids(ids, tenant)
+            absent = [chroma_id for chroma_id in ids if chroma_id not in stored]
+            if absent and await vector_store.copy_papers(absent, tenant):
+                copied += len(absent)
+
+
+async def reconcile_vectors(session_factory: async_sessionmaker[AsyncSession]) -> dict:
+    """Run one reconciliation pass over the active research collection."""
+    if await reindex.is_running():
+        return {"status": "skipped", "reason": "reindex in progress"}
+
+    redis = get_redis()
+    collection = await vector_store.active_collection()
+    lock_key = f"vector_store:reconcile:{collection}:lock"
+    if not await redis.set(lock_key, 1, nx=True, ex=_LOCK_SECONDS):
+        return {"status": "skipped", "reason": "already running"}
+
+    try:
+        async with session_factory() as db:
+            missing, reembedded = await _reembed_missing(db, collection)
+            orphans = await _find_orphans(db, collection)
+            tenant_copied = await _copy_missing_tenant_vectors(db) if settings.CHROMA_TENANT_COLLECTIONS else 0
+
+        candidates_key = f"vector_store:reconcile:{collection}:orphans"
+        previous = {member.decode() for member in await redis.smembers(candidates_key)}
+        purge = sorted(orphans & previous)
+        for start in range(0, len(purge), settings.RECONCILE_PAGE_SIZE):
+            await vector_store.delete_papers(purge[start:start + settings.RECONCILE_PAGE_SIZE], collection)
+
+        pipe = redis.pipeline()
+        pipe.delete(candidates_key)
+        if orphans - previous:
+            pipe.sadd(candidates_key, *(orphans - previous))
+            pipe.expire(candidates_key, _CANDIDATE_TTL_SECONDS)
+        await pipe.execute()
+
+        await metrics.set_gauge("reconcile.missing", missing)
+        await metrics.set_gauge("reconcile.orphaned", len(orphans))
+        await metrics.incr("reconcile.reembedded", reembedded)
+        await metrics.incr("reconcile.purged", len(purge))
+        await metrics.incr("reconcile.tenant_copied", tenant_copied)
+        if missing or orphans:
+            logger.warning(
+                "Vector store drift in %s: %d missing (%d re-embedded), %d orphaned (%d purged)",
+                collection, missing, reembedded, len(orphans), len(purge),
+            )
+        return {
+            "status": "completed",
+            "collection": collection,
+            "missing": missing,
+            "reembedded": reembedded,
+            "orphaned": len(orphans),
+            "purged": len(purge),
+            "tenant_copied": tenant_copied,
+        }
+    finally:
+        await redis.delete(lock_key)
@@ -0,0 +1,236 @@
+"""
+Reindex — rebuilds the shared research collection from PostgreSQL.
+
+Papers are re-embedded into a fresh collection while the current one keeps
+serving, then the alias is switched and tenant collections are refilled.
+Progress is checkpointed in Redis, so an interrupted run resumes.
+"""
+
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.db.redis import get_redis
+from app.models.paper import Paper, UserPaper
+from app.services import metrics, vector_store
+from app.services.research import index_papers, mark_indexed, publish_indexed
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# now() is the transaction start, so a row committed after a cursor opened can
+# carry an earlier created_at; catch-up passes look back this far
+_CATCH_UP_MARGIN = timedelta(minutes=10)
+# Lock lifetime, renewed after every batch
+_LOCK_SECONDS = 600
+# Users whose tenant collections are rebuilt per page
+_TENANT_PAGE_SIZE = 100
+
+
+class ReindexError(Exception):
+    """A batch could not be embedded or stored; the checkpoint is kept for resuming."""
+
+
+def _checkpoint_key() -> str:
+    return f"vector_store:reindex:{settings.CHROMA_COLLECTION_RESEARCH}"
+
+
+def _lock_key() -> str:
+    return f"{_checkpoint_key()}:lock"
+
+
+async def is_running() -> bool:
+    """Whether a reindex job currently holds the lock (a leftover checkpoint alone does not count)."""
+    return bool(await get_redis().exists(_lock_key()))
+
+
+async def load_checkpoint() -> Optional[dict]:
+    """The interrupted job's state, or None when no reindex is in progress."""
+    raw = await get_redis().hgetall(_checkpoint_key())
+    if not raw:
+        return None
+    state = {k.decode(): v.decode() for k, v in raw.items()}
+    state["papers_done"] = int(state["papers_done"])
+    state["tenants_done"] = int(state.get("tenants_done", 0))
+    return state
+
+
+async def _save_checkpoint(state: dict) -> None:
+    await get_redis().hset(_checkpoint_key(), mapping={k: str(v) for k, v in state.items()})
+
+
+async def reindex_papers(
+    session_factory: async_sessionmaker[AsyncSession],
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Rebuild the research collection, resuming an interrupted run if any.
+    Raises ReindexError if a batch fails.
+    """
+    redis = get_redis()
+    lock_key = _lock_key()
+    token = uuid.uuid4().hex
+    if not await redis.set(lock_key, token, nx=True, ex=_LOCK_SECONDS):
+        return {"status": "already_running"}
+
+    try:
+        state = await load_checkpoint()
+        if state is None:
+            now = datetime.now(timezone.utc)
+            state = {
+                "target": f"{settings.CHROMA_COLLECTION_RESEARCH}_{now:%Y%m%d%H%M%S}",
+                "phase": "stream",
+                "started_at": now.isoformat(),
+                "last_id": "",
+                "papers_done": 0,
+                "tenants_done": 0,
+            }
+            await _save_checkpoint(state)
+        else:
+            logger.info("Resuming reindex into %s after %d papers", state["target"], state["papers_done"])
+
+        run_started = time.perf_counter()
+        run_done = 0
+
+        async def _stream(stmt: Select, resumable: bool) -> None:
+            # Until the switch the vectors exist only in the inactive target, so
+            # index_status is left alone and pending papers stay with the indexer
+            nonlocal run_done
+            async with session_factory() as db:
+                result = await db.stream_scalars(
+                    stmt.order_by(Paper.id).execution_options(yield_per=settings.REINDEX_BATCH_SIZE)
+                )
+                async for batch in result.partitions():
+                    if not await index_papers(list(batch), state["target"]):
+                        raise ReindexError(f"Indexing failed after {state['papers_done']} papers")
+                    if state["phase"] == "switched":
+                        await _mark_indexed(session_factory, [p.id for p in batch])
+                    for paper in batch:
+                        db.expunge(paper)
+
+                    run_done += len(batch)
+                    state["papers_done"] += len(batch)
+                    if resumable:
+                        state["last_id"] = str(batch[-1].id)
+                    await _save_checkpoint(state)
+                    await redis.expire(lock_key, _LOCK_SECONDS)
+
+                    rate = run_done / max(time.perf_counter() - run_started, 1e-9)
+                    await metrics.set_gauge("reindex.papers_per_second", rate)
+                    if on_progress:
+                        on_progress({
+                            "collection": state["target"],
+                            "phase": state["phase"],
+                            "papers_done": state["papers_done"],
+                            "papers_per_second": round(rate, 1),
+                        })
+
+        if state["phase"] == "stream":
+            stmt = select(Paper)
+            if state["last_id"]:
+                stmt = stmt.where(Paper.id > uuid.UUID(state["last_id"]))
+            await _stream(stmt, resumable=True)
+            state["phase"] = "catch_up"
+            state["catch_up_at"] = datetime.now(timezone.utc).isoformat()
+            await _save_checkpoint(state)
+
+        if state["phase"] == "catch_up":
+            since = datetime.fromisoformat(state["started_at"]) - _CATCH_UP_MARGIN
+            await _stream(select(Paper).where(Paper.created_at >= since), resumable=False)
+            state["previous"] = await vector_store.switch_collection(state["target"])
+            state["phase"] = "switched"
+            await _save_checkpoint(state)
+            logger.info("Research collection switched from %s to %s", state["previous"], state["target"])
+
+        if state["phase"] == "switched":
+            # Papers written to the old collection between the catch-up pass and the switch
+            since = datetime.fromisoformat(state["catch_up_at"]) - _CATCH_UP_MARGIN
+            await _stream(select(Paper).where(Paper.created_at >= since), resumable=False)
+            state["phase"] = "tenants"
+            await _save_checkpoint(state)
+
+        if settings.CHROMA_TENANT_COLLECTIONS:
+            await _rebuild_tenants(session_factory, state, lock_key, on_progress)
+
+        elapsed = time.perf_counter() - run_started
+        rate = run_done / max(elapsed, 1e-9)
+        await redis.delete(_checkpoint_key())
+        await metrics.incr("reindex.completed")
+        return {
+            "status": "completed",
+            "collection": state["target"],
+            "previous": state.get("previous"),
+            "papers_done": state["papers_done"],
+            "tenants_done": state["tenants_done"],
+            "seconds": round(elapsed, 1),
+            "papers_per_second": round(rate, 1),
+        }
+    finally:
+        if await redis.get(lock_key) == token.encode():
+            await redis.delete(lock_key)
+
+
+async def _rebuild_tenants(
+    session_factory: async_sessionmaker[AsyncSession],
+    state: dict,
+    lock_key: str,
+    on_progress: Optional[Callable[[dict], None]],
+) -> None:
+    """Clear and refill every user's tenant collection from the (already switched) research collection."""
+    redis = get_redis()
+    while True:
+        async with session_factory() as db:
+            stmt = select(UserPaper.user_id).distinct().order_by(UserPaper.user_id).limit(_TENANT_PAGE_SIZE)
+            if state.get("tenant_last_user"):
+                stmt = stmt.where(UserPaper.user_id > uuid.UUID(state["tenant_last_user"]))
+            users = (await db.scalars(stmt)).all()
+        if not users:
+            return
+
+        for user_id in users:
+            tenant = vector_store.tenant_collection_name(user_id)
+            await vector_store.clear_collection(tenant)
+            last_id = None
+            while True:
+                async with session_factory() as db:
+                    stmt = (
+                        select(UserPaper.paper_id)
+                        .join(Paper, Paper.id == UserPaper.paper_id)
+                        .where(UserPaper.user_id == user_id, Paper.index_status == "indexed")
+                        .order_by(UserPaper.paper_id)
+                        .limit(settings.REINDEX_BATCH_SIZE)
+                    )
+                    if last_id is not None:
+                        stmt = stmt.where(UserPaper.paper_id > last_id)
+                    paper_ids = (await db.scalars(stmt)).all()
+                if not paper_ids:
+                    break
+                last_id = paper_ids[-1]
+                if not await vector_store.copy_papers([str(pid) for pid in paper_ids], tenant):
+                    raise ReindexError(f"Rebuilding tenant collection {tenant} failed")
+
+            state["tenant_last_user"] = str(user_id)
+            state["tenants_done"] += 1
+            await _save_checkpoint(state)
+            await redis.expire(lock_key, _LOCK_SECONDS)
+            if on_progress:
+                on_progress({
+                    "collection": state["target"],
+                    "phase": state["phase"],
+                    "papers_done": state["papers_done"],
+                    "tenants_done": state["tenants_done"],
+                })
+
+
+async def _mark_indexed(session_factory: async_sessionmaker[AsyncSession], paper_ids: list[uuid.UUID]) -> None:
+    async with session_factory() as db:
+        await mark_indexed(db, paper_ids)
+        await db.commit()
+        await publish_indexed(db, paper_ids)
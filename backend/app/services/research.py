@@ -3,58 +3,183 @@ Research service — fetches papers from Semantic Scholar & arXiv,
 stores them in PostgreSQL, and indexes them in ChromaDB.
 """
 
+import asyncio
 import logging
+import time
 import uuid
 import xml.etree.ElementTree as ET
-from typing import Optional
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from typing import Any, Optional
 
 import httpx
-from sqlalchemy import select
+from sqlalchemy import Select, String, cast, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from tenacity import retry, stop_after_attempt, wait_exponential
 
-from app.models.paper import Paper
-from app.services import chroma as chroma_svc
+from app.config import get_settings
+from app.models.paper import Paper, UserPaper
+from app.services import cache, embeddings, metrics
+from app.services import ratelimit, search_cache, vector_store
+from app.services.http import get_http_client
+from app.services.identity import (
+    canonical_key,
+    merge_duplicates,
+    normalize_arxiv_id,
+    normalize_doi,
+    title_fingerprint,
+)
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 SEMANTIC_SCHOLAR_BASE = "https://api.semanticscholar.org/graph/v1"
 ARXIV_BASE = "https://export.arxiv.org/api/query"
 ARXIV_NS = "http://www.w3.org/2005/Atom"
 
+# Upstream hosts whose pooled HTTP clients are opened at process start
+UPSTREAM_URLS = (SEMANTIC_SCHOLAR_BASE, ARXIV_BASE)
+
 _FIELDS = "title,abstract,authors,year,externalIds,url,citationCount,fieldsOfStudy"
 
+# Provider limits for identifier batches
+SS_BATCH_LIMIT = 500          # ids per POST /paper/batch
+ARXIV_ID_LIST_LIMIT = 100     # ids per id_list query
+
+ARXIV_HARVEST_PAGE_SIZE = 200
+
+
+# Qualified Atom tag names, built once instead of per element lookup
+_ATOM_ENTRY = f"{{{ARXIV_NS}}}entry"
+_ATOM_TITLE = f"{{{ARXIV_NS}}}title"
+_ATOM_SUMMARY = f"{{{ARXIV_NS}}}summary"
+_ATOM_PUBLISHED = f"{{{ARXIV_NS}}}published"
+_ATOM_ID = f"{{{ARXIV_NS}}}id"
+_ATOM_AUTHOR = f"{{{ARXIV_NS}}}author"
+_ATOM_NAME = f"{{{ARXIV_NS}}}name"
+
 
 # ---------------------------------------------------------------------------
 # External API helpers
 # ---------------------------------------------------------------------------
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=8))
-async def _ss_get(path: str, params: dict) -> dict:
-    async with httpx.AsyncClient(timeout=20) as client:
-        resp = await client.get(f"{SEMANTIC_SCHOLAR_BASE}{path}", params=params)
+_MAX_ATTEMPTS = 3
+
+
+def _backoff(attempt: int) -> float:
+    return min(2 ** attempt, 8)
+
+
+def _auth_headers(provider: str) -> dict:
+    if provider == "semantic_scholar" and settings.SEMANTIC_SCHOLAR_API_KEY:
+        return {"x-api-key": settings.SEMANTIC_SCHOLAR_API_KEY}
+    return {}
+
+
+async def _throttled(provider: str, resp: httpx.Response, attempt: int) -> None:
+    """Push back the whole cluster after a 429/503 instead of retrying blindly."""
+    delay = ratelimit.parse_retry_after(resp.headers.get("Retry-After")) or _backoff(attempt)
+    logger.info("%s throttled us (HTTP %d); pausing %.1fs", provider, resp.status_code, delay)
+    await ratelimit.penalize(provider, delay)
+
+
+async def _send(provider: str, base_url: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    Send one upstream request through the shared rate limiter.
+
+    429/503 responses block the provider cluster-wide for Retry-After seconds
+    and the request is retried once the limiter lets it through; other 5xx and
+    transport errors back off exponentially. 4xx errors (e.g. 404) are raised
+    immediately.
+    """
+    client = get_http_client(base_url)
+    for attempt in range(1, _MAX_ATTEMPTS + 1):
+        await ratelimit.acquire(provider)
+        try:
+            resp = await client.request(method, url, headers=_auth_headers(provider), **kwargs)
+        except httpx.TransportError:
+            if attempt == _MAX_ATTEMPTS:
+                raise
+            await asyncio.sleep(_backoff(attempt))
+            continue
+        if attempt < _MAX_ATTEMPTS:
+            if resp.status_code in (429, 503):
+                await _throttled(provider, resp, attempt)
+                continue
+            if resp.status_code >= 500:
+                await asyncio.sleep(_backoff(attempt))
+                continue
         resp.raise_for_status()
-        return resp.json()
+        return resp
+    raise AssertionError("unreachable")
+
+
+async def _ss_get(path: str, params: dict) -> dict:
+    resp = await _send(
+        "semantic_scholar", SEMANTIC_SCHOLAR_BASE, "GET", f"{SEMANTIC_SCHOLAR_BASE}{path}", params=params
+    )
+    return resp.json()
+
+
+async def _ss_post(path: str, params: dict, body: dict) -> Any:
+    resp = await _send(
+        "semantic_scholar", SEMANTIC_SCHOLAR_BASE, "POST", f"{SEMANTIC_SCHOLAR_BASE}{path}",
+        params=params, json=body,
+    )
+    return resp.json()
+
+
+async def _arxiv_get(params: dict) -> httpx.Response:
+    return await _send("arxiv", ARXIV_BASE, "GET", ARXIV_BASE, params=params)
+
+
+def _is_not_found(exc: Exception) -> bool:
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 404
 
 
 async def fetch_by_doi(doi: str) -> Optional[dict]:
     """Fetch paper details from Semantic Scholar by DOI."""
-    try:
-        data = await _ss_get(f"/paper/DOI:{doi}", {"fields": _FIELDS})
+    async def _load() -> Optional[dict]:
+        try:
+            data = await _ss_get(f"/paper/DOI:{doi}", {"fields": _FIELDS})
+        except httpx.HTTPStatusError as exc:
+            if _is_not_found(exc):
+                return None
+            raise
         return _parse_ss_paper(data)
+
+    try:
+        return await cache.cached(
+            "semantic_scholar",
+            f"doi:{normalize_doi(doi)}",
+            _load,
+            ttl=settings.UPSTREAM_CACHE_LOOKUP_TTL_SECONDS,
+        )
     except Exception as exc:
         logger.warning("Semantic Scholar DOI lookup failed (%s): %s", doi, exc)
         return None
 
 
-async def search_semantic_scholar(query: str, limit: int = 5) -> list[dict]:
-    """Search Semantic Scholar for papers matching query."""
-    try:
+async def _ss_search(query: str, limit: int) -> list[dict]:
+    async def _load() -> list[dict]:
         data = await _ss_get(
             "/paper/search",
             {"query": query, "limit": limit, "fields": _FIELDS},
         )
         return [_parse_ss_paper(p) for p in data.get("data", [])]
+
+    return await cache.cached(
+        "semantic_scholar",
+        f"search:{limit}:{cache.normalize_query(query)}",
+        _load,
+        ttl=settings.UPSTREAM_CACHE_SEARCH_TTL_SECONDS,
+        empty=[],
+    )
+
+
+async def search_semantic_scholar(query: str, limit: int = 5) -> list[dict]:
+    """Search Semantic Scholar for papers matching query."""
+    try:
+        return await _ss_search(query, limit)
     except Exception as exc:
         logger.warning("Semantic Scholar search failed (%s): %s", query, exc)
         return []
@@ -62,35 +187,185 @@ async def search_semantic_scholar(query: str, limit: int = 5) -> list[dict]:
 
 async def fetch_arxiv(arxiv_id: str) -> Optional[dict]:
     """Fetch paper from arXiv by ID (e.g. '2301.00001' or 'cs.AI/0001001')."""
+    async def _load() -> Optional[dict]:
+        resp = await _arxiv_get({"id_list": normalize_arxiv_id(arxiv_id)})
+        papers = _parse_arxiv_xml(resp.text, limit=1) if resp.text else []
+        return papers[0] if papers else None
+
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.get(ARXIV_BASE, params={"id_list": arxiv_id})
-            resp.raise_for_status()
-        return _parse_arxiv_xml(resp.text, limit=1)[0] if resp.text else None
+        return await cache.cached(
+            "arxiv",
+            f"id:{normalize_arxiv_id(arxiv_id)}",
+            _load,
+            ttl=settings.UPSTREAM_CACHE_LOOKUP_TTL_SECONDS,
+        )
     except Exception as exc:
         logger.warning("arXiv fetch failed (%s): %s", arxiv_id, exc)
         return None
 
 
+async def _arxiv_search(query: str, limit: int) -> list[dict]:
+    async def _load() -> list[dict]:
+        resp = await _arxiv_get({
+            "search_query": f"all:{query}",
+            "max_results": limit,
+            "sortBy": "relevance",
+        })
+        return _parse_arxiv_xml(resp.text, limit=limit)
+
+    return await cache.cached(
+        "arxiv",
+        f"search:{limit}:{cache.normalize_query(query)}",
+        _load,
+        ttl=settings.UPSTREAM_CACHE_SEARCH_TTL_SECONDS,
+        empty=[],
+    )
+
+
 async def search_arxiv(query: str, limit: int = 5) -> list[dict]:
     """Search arXiv for papers matching query."""
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.get(
-                ARXIV_BASE,
-                params={
-                    "search_query": f"all:{query}",
-                    "max_results": limit,
-                    "sortBy": "relevance",
-                },
-            )
-            resp.raise_for_status()
-        return _parse_arxiv_xml(resp.text, limit=limit)
+        return await _arxiv_search(query, limit)
     except Exception as exc:
         logger.warning("arXiv search failed (%s): %s", query, exc)
         return []
 
 
+# ---------------------------------------------------------------------------
+# Source registry & multi-source fan-out
+# ---------------------------------------------------------------------------
+
+SearchFn = Callable[[str, int], Awaitable[list[dict]]]
+
+# name -> search coroutine. Registered functions must raise on failure so the
+# fan-out can report an accurate per-source status.
+SOURCES: dict[str, SearchFn] = {
+    "semantic_scholar": _ss_search,
+    "arxiv": _arxiv_search,
+}
+
+
+def register_source(name: str) -> Callable[[SearchFn], SearchFn]:
+    """Decorator: add an open-access search provider to the ingest fan-out."""
+    def decorator(fn: SearchFn) -> SearchFn:
+        SOURCES[name] = fn
+        return fn
+    return decorator
+
+
+async def _search_one_source(name: str, query: str, limit: int, timeout: float) -> tuple[list[dict], dict]:
+    started = time.perf_counter()
+    papers: list[dict] = []
+    status: dict = {"source": name, "status": "ok", "detail": None}
+    try:
+        with ratelimit.deadline(timeout):
+            papers = await asyncio.wait_for(SOURCES[name](query, limit), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning("%s search timed out after %.1fs (%s)", name, timeout, query)
+        status.update(status="timeout", detail=f"No response within {timeout:g}s")
+    except ratelimit.RateLimited as exc:
+        logger.info("%s search skipped (%s): %s", name, query, exc)
+        status.update(status="rate_limited", detail=str(exc))
+    except Exception as exc:
+        logger.warning("%s search failed (%s): %s", name, query, exc)
+        status.update(status="error", detail=str(exc) or exc.__class__.__name__)
+    status["count"] = len(papers)
+    status["elapsed_ms"] = int((time.perf_counter() - started) * 1000)
+    return papers, status
+
+
+async def search_all_sources(
+    query: str,
+    limit: int = 5,
+    sources: Optional[list[str]] = None,
+    timeout: Optional[float] = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Query every registered source concurrently, each under its own deadline.
+
+    Returns (papers, statuses): papers from all sources that answered in time,
+    in registry order, plus one status dict per source
+    ({source, status: ok|timeout|rate_limited|error, count, elapsed_ms, detail}).
+    """
+    names = sources or list(SOURCES)
+    deadline = timeout or settings.RESEARCH_SOURCE_TIMEOUT_SECONDS
+    outcomes = await asyncio.gather(
+        *(_search_one_source(name, query, limit, deadline) for name in names)
+    )
+    papers = [p for source_papers, _ in outcomes for p in source_papers]
+    return papers, [status for _, status in outcomes]
+
+
+# ---------------------------------------------------------------------------
+# Batch identifier lookup
+# ---------------------------------------------------------------------------
+
+def _chunks(items: list[str], size: int) -> list[list[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def fetch_by_dois(dois: list[str]) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    Resolve normalized DOIs via Semantic Scholar's batch lookup, cached ones first.
+    Returns (found, failed) keyed by DOI; DOIs in neither were not found.
+    """
+    hits = await cache.get_many("semantic_scholar", [f"doi:{doi}" for doi in dois])
+    found: dict[str, dict] = {key[4:]: paper for key, paper in hits.items() if paper}
+    failed: dict[str, str] = {}
+    pending = [doi for doi in dois if f"doi:{doi}" not in hits]
+
+    async def _resolve(chunk: list[str]) -> None:
+        try:
+            data = await _ss_post(
+                "/paper/batch",
+                {"fields": _FIELDS},
+                {"ids": [f"DOI:{doi}" for doi in chunk]},
+            )
+        except Exception as exc:
+            logger.warning("Semantic Scholar batch lookup failed (%d ids): %s", len(chunk), exc)
+            failed.update({doi: str(exc) or exc.__class__.__name__ for doi in chunk})
+            return
+        # The response is positionally aligned with the request; unknown ids are null
+        for doi, item in zip(chunk, data):
+            if item:
+                found[doi] = _parse_ss_paper(item)
+        await cache.set_many(
+            "semantic_scholar",
+            {f"doi:{doi}": found.get(doi) for doi in chunk},
+            ttl=settings.UPSTREAM_CACHE_LOOKUP_TTL_SECONDS,
+        )
+
+    await asyncio.gather(*(_resolve(chunk) for chunk in _chunks(pending, SS_BATCH_LIMIT)))
+    return found, failed
+
+
+async def fetch_arxiv_batch(arxiv_ids: list[str]) -> tuple[dict[str, dict], dict[str, str]]:
+    """Resolve normalized arXiv IDs in id_list chunks. Returns (found, failed) as fetch_by_dois."""
+    hits = await cache.get_many("arxiv", [f"id:{arxiv_id}" for arxiv_id in arxiv_ids])
+    found: dict[str, dict] = {key[3:]: paper for key, paper in hits.items() if paper}
+    failed: dict[str, str] = {}
+    pending = [arxiv_id for arxiv_id in arxiv_ids if f"id:{arxiv_id}" not in hits]
+
+    for chunk in _chunks(pending, ARXIV_ID_LIST_LIMIT):
+        try:
+            resp = await _arxiv_get({"id_list": ",".join(chunk), "max_results": len(chunk)})
+        except Exception as exc:
+            logger.warning("arXiv batch fetch failed (%d ids): %s", len(chunk), exc)
+            failed.update({arxiv_id: str(exc) or exc.__class__.__name__ for arxiv_id in chunk})
+            continue
+        wanted = set(chunk)
+        for paper in _parse_arxiv_xml(resp.text, limit=len(chunk)):
+            arxiv_id = normalize_arxiv_id(paper["url"] or "")
+            if arxiv_id in wanted:
+                found[arxiv_id] = paper
+        await cache.set_many(
+            "arxiv",
+            {f"id:{arxiv_id}": found.get(arxiv_id) for arxiv_id in chunk},
+            ttl=settings.UPSTREAM_CACHE_LOOKUP_TTL_SECONDS,
+        )
+    return found, failed
+
+
 # ---------------------------------------------------------------------------
 # Parsers
 # ---------------------------------------------------------------------------
@@ -107,6 +382,7 @@ def _parse_ss_paper(data: dict) -> dict:
         "authors": authors,
         "year": data.get("year"),
         "doi": doi,
+        "arxiv_id": arxiv_id,
         "url": url,
         "source": "semantic_scholar",
         "field_tags": data.get("fieldsOfStudy") or [],
@@ -114,121 +390,607 @@ def _parse_ss_paper(data: dict) -> dict:
     }
 
 
+def _parse_arxiv_entry(entry: ET.Element) -> dict:
+    """Convert one Atom <entry> into a paper dict in a single pass over its children."""
+    title, abstract, year, url = "Untitled", None, None, None
+    authors: list[str] = []
+    for child in entry:
+        tag, text = child.tag, child.text
+        if tag == _ATOM_TITLE and text:
+            title = text.strip()
+        elif tag == _ATOM_SUMMARY and text:
+            abstract = text.strip()
+        elif tag == _ATOM_PUBLISHED and text:
+            year = int(text[:4])
+        elif tag == _ATOM_ID and text:
+            url = text.strip()
+        elif tag == _ATOM_AUTHOR:
+            name = child.findtext(_ATOM_NAME)
+            if name:
+                authors.append(name)
+    return {
+        "title": title,
+        "abstract": abstract,
+        "authors": authors,
+        "year": year,
+        "doi": None,
+        "arxiv_id": normalize_arxiv_id(url) if url else None,
+        "url": url,
+        "source": "arxiv",
+        "field_tags": ["computer_science"],
+        "citations_count": 0,
+    }
+
+
+def _drain_arxiv_entries(parser: ET.XMLPullParser) -> Iterator[dict]:
+    """Yield papers for every <entry> the incremental parser has completed, then free it."""
+    for _, elem in parser.read_events():
+        if elem.tag == _ATOM_ENTRY:
+            yield _parse_arxiv_entry(elem)
+            elem.clear()
+
+
 def _parse_arxiv_xml(xml_text: str, limit: int = 10) -> list[dict]:
-    papers = []
+    papers: list[dict] = []
+    parser = ET.XMLPullParser(events=("end",))
     try:
-        root = ET.fromstring(xml_text)
-        for entry in root.findall(f"{{{ARXIV_NS}}}entry")[:limit]:
-            title_el = entry.find(f"{{{ARXIV_NS}}}title")
-            summary_el = entry.find(f"{{{ARXIV_NS}}}summary")
-            published_el = entry.find(f"{{{ARXIV_NS}}}published")
-            id_el = entry.find(f"{{{ARXIV_NS}}}id")
-            title = title_el.text.strip() if title_el is not None else "Untitled"
-            abstract = summary_el.text.strip() if summary_el is not None else None
-            year = int(published_el.text[:4]) if published_el is not None else None
-            url = id_el.text.strip() if id_el is not None else None
-            authors = [
-                a.find(f"{{{ARXIV_NS}}}name").text
-                for a in entry.findall(f"{{{ARXIV_NS}}}author")
-                if a.find(f"{{{ARXIV_NS}}}name") is not None
-            ]
-            papers.append({
-                "title": title,
-                "abstract": abstract,
-                "authors": authors,
-                "year": year,
-                "doi": None,
-                "url": url,
-                "source": "arxiv",
-                "field_tags": ["computer_science"],
-                "citations_count": 0,
-            })
+        parser.feed(xml_text)
+        for paper in _drain_arxiv_entries(parser):
+            papers.append(paper)
+            if len(papers) >= limit:
+                break
     except ET.ParseError as exc:
         logger.warning("arXiv XML parse error: %s", exc)
     return papers
 
 
 # ---------------------------------------------------------------------------
-# DB operations
+# Streaming arXiv harvest
 # ---------------------------------------------------------------------------
 
-async def save_paper(db: AsyncSession, paper_data: dict, owner_id: uuid.UUID) -> Paper:
-    """Persist a paper to PostgreSQL (skip duplicates by DOI) and index in ChromaDB."""
-    # Dedup by DOI if present
-    doi = paper_data.get("doi")
-    if doi:
-        existing = await db.execute(
-            select(Paper).where(Paper.doi == doi, Paper.owner_id == owner_id)
-        )
-        existing_paper = existing.scalar_one_or_none()
-        if existing_paper:
-            return existing_paper
+async def harvest_arxiv(
+    query: str,
+    max_results: int,
+    page_size: int = ARXIV_HARVEST_PAGE_SIZE,
+) -> AsyncIterator[dict]:
+    """
+    Page through an arXiv search, yielding papers as each response streams in.
+    Failed pages are retried like _send and resume after the last entry yielded.
+    """
+    client = get_http_client(ARXIV_BASE)
+    harvested = 0
+    while harvested < max_results:
+        size = min(page_size, max_results - harvested)
+        page_count = 0
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            await ratelimit.acquire("arxiv")
+            parser = ET.XMLPullParser(events=("end",))
+            try:
+                async with client.stream(
+                    "GET",
+                    ARXIV_BASE,
+                    params={
+                        "search_query": f"all:{query}",
+                        # A retry resumes after the entries already yielded
+                        "start": harvested + page_count,
+                        "max_results": size - page_count,
+                        # Stable ordering so pages neither overlap nor skip entries
+                        "sortBy": "submittedDate",
+                        "sortOrder": "descending",
+                    },
+                ) as resp:
+                    if attempt < _MAX_ATTEMPTS:
+                        if resp.status_code in (429, 503):
+                            await _throttled("arxiv", resp, attempt)
+                            continue
+                        if resp.status_code >= 500:
+                            await asyncio.sleep(_backoff(attempt))
+                            continue
+                    resp.raise_for_status()
+                    async for chunk in resp.aiter_bytes():
+                        parser.feed(chunk)
+                        for paper in _drain_arxiv_entries(parser):
+                            page_count += 1
+                            yield paper
+                break
+            except httpx.TransportError:
+                if attempt == _MAX_ATTEMPTS:
+                    raise
+                await asyncio.sleep(_backoff(attempt))
+        harvested += page_count
+        if page_count < size:
+            break  # result set exhausted
 
-    paper = Paper(
-        owner_id=owner_id,
-        **{k: v for k, v in paper_data.items()},
-    )
-    db.add(paper)
-    await db.flush()
-
-    # Index in ChromaDB
-    chroma_id = str(paper.id)
-    chroma_svc.upsert_paper(
-        chroma_id=chroma_id,
-        title=paper.title,
-        abstract=paper.abstract or "",
-        metadata={
+
+# ---------------------------------------------------------------------------
+# DB operations
+# ---------------------------------------------------------------------------
+
+# Columns accepted from parsed paper dicts, with the defaults used when a
+# source omits them (multi-row VALUES needs the same keys on every row)
+_PAPER_DEFAULTS: dict[str, Any] = {
+    "title": "Untitled",
+    "abstract": None,
+    "authors": [],
+    "year": None,
+    "doi": None,
+    "arxiv_id": None,
+    "url": None,
+    "source": "manual",
+    "field_tags": [],
+    "citations_count": 0,
+}
+
+
+def _paper_row(paper_data: dict) -> dict:
+    row = {k: paper_data.get(k, default) for k, default in _PAPER_DEFAULTS.items()}
+    row["title"] = row["title"] or "Untitled"
+    row["citations_count"] = row["citations_count"] or 0
+    if row["doi"]:
+        row["doi"] = normalize_doi(row["doi"])
+    if row["arxiv_id"]:
+        row["arxiv_id"] = normalize_arxiv_id(row["arxiv_id"])
+    row["title_fingerprint"] = title_fingerprint(row["title"], row["year"])
+    row["canonical_key"] = canonical_key(row)
+    row["id"] = uuid.uuid4()
+    return row
+
+
+def _chroma_item(paper: Paper) -> dict:
+    return {
+        "chroma_id": str(paper.id),
+        "title": paper.title,
+        "abstract": paper.abstract or "",
+        "metadata": {
             "paper_id": str(paper.id),
-            "owner_id": str(owner_id),
             "year": paper.year or 0,
             "source": paper.source,
+            **vector_store.field_flags(paper.field_tags or []),
         },
+    }
+
+
+async def index_papers(papers: list[Paper], collection: Optional[str] = None) -> bool:
+    """
+    Embed papers through the shared micro-batcher and upsert them into the
+    vector store (the active research collection unless `collection` is given).
+    """
+    items = [_chroma_item(p) for p in papers]
+    try:
+        vectors = await embeddings.embed_documents(
+            [vector_store.paper_document(item["title"], item["abstract"]) for item in items]
+        )
+    except Exception as exc:
+        logger.error("Embedding failed for %d papers: %s", len(items), exc)
+        return False
+    return await vector_store.upsert_papers(items, vectors, collection)
+
+
+async def mark_indexed(db: AsyncSession, paper_ids: list[uuid.UUID]) -> None:
+    """Record that the papers' vectors were just stored (chroma_id, index_status)."""
+    await db.execute(
+        update(Paper)
+        .where(Paper.id.in_(paper_ids))
+        .values(chroma_id=cast(Paper.id, String), index_status="indexed")
+        .execution_options(synchronize_session=False)
     )
-    paper.chroma_id = chroma_id
-    await db.flush()
-    return paper
 
 
-async def semantic_search(
-    query: str,
+async def index_pending(
+    db: AsyncSession, batch_size: int, retry_failed: bool = False
+) -> tuple[int, list[uuid.UUID]]:
+    """
+    Claim, embed and mark a batch of pending papers (SKIP LOCKED), 'failed' on error.
+    The caller commits, then calls publish_indexed(). Returns (claimed, indexed ids).
+    """
+    statuses = ["pending", "failed"] if retry_failed else ["pending"]
+    papers = list((await db.scalars(
+        select(Paper)
+        .where(Paper.index_status.in_(statuses))
+        .order_by(Paper.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True, key_share=True)
+    )).all())
+    if not papers:
+        return 0, []
+
+    paper_ids = [p.id for p in papers]
+    if not await index_papers(papers):
+        await db.execute(
+            update(Paper)
+            .where(Paper.id.in_(paper_ids))
+            .values(index_status="failed")
+            .execution_options(synchronize_session=False)
+        )
+        await metrics.incr("papers.index.failed", len(papers))
+        return len(papers), []
+
+    await mark_indexed(db, paper_ids)
+    await metrics.incr("papers.index.indexed", len(papers))
+    return len(papers), paper_ids
+
+
+async def _copy_to_tenant(owner_id: uuid.UUID, chroma_ids: list[str]) -> None:
+    """Copy the owner's indexed papers that their tenant collection lacks."""
+    tenant = vector_store.tenant_collection_name(owner_id)
+    try:
+        present = await vector_store.existing_ids(chroma_ids, tenant)
+    except Exception as exc:
+        logger.warning("Tenant collection %s unavailable, reconcile will backfill it: %s", tenant, exc)
+        return
+    await vector_store.copy_papers([i for i in chroma_ids if i not in present], tenant)
+
+
+async def publish_indexed(db: AsyncSession, paper_ids: list[uuid.UUID]) -> None:
+    """
+    After index_pending commits: copy the papers into their owners' tenant
+    collections and drop the owners' cached searches.
+    """
+    if not paper_ids:
+        return
+    owners: dict[uuid.UUID, list[str]] = {}
+    for user_id, paper_id in (await db.execute(
+        select(UserPaper.user_id, UserPaper.paper_id).where(UserPaper.paper_id.in_(paper_ids))
+    )).all():
+        owners.setdefault(user_id, []).append(str(paper_id))
+    for user_id, chroma_ids in owners.items():
+        if settings.CHROMA_TENANT_COLLECTIONS:
+            await _copy_to_tenant(user_id, chroma_ids)
+        await search_cache.bump_library_version(user_id)
+
+
+def schedule_indexing(papers: list[Paper]) -> None:
+    """Queue the indexing task if any of the (committed) papers still awaits embedding."""
+    if not any(p.index_status == "pending" for p in papers):
+        return
+    from app.tasks.research_tasks import index_pending_papers_task
+
+    try:
+        index_pending_papers_task.delay()
+    except Exception as exc:
+        logger.warning("Could not queue paper indexing, the periodic sweep will pick it up: %s", exc)
+
+
+async def publish_saved(db: AsyncSession, owner_id: uuid.UUID, papers: list[Paper]) -> None:
+    """
+    After save_papers commits: publish the already-indexed papers to the owner
+    and queue the pending ones for indexing.
+    """
+    if not papers:
+        return
+    if settings.CHROMA_TENANT_COLLECTIONS:
+        indexed = (await db.scalars(
+            select(Paper.id).where(
+                Paper.id.in_({p.id for p in papers}), Paper.index_status == "indexed"
+            )
+        )).all()
+        if indexed:
+            await _copy_to_tenant(owner_id, [str(paper_id) for paper_id in indexed])
+    await search_cache.bump_library_version(owner_id)
+    schedule_indexing(papers)
+
+
+async def _find_existing(db: AsyncSession, rows: list[dict]) -> list[Optional[Paper]]:
+    """
+    Match rows against stored papers by DOI, arXiv ID or title fingerprint in
+    one indexed SELECT. Returns the stored Paper (or None) for each row,
+    preferring the strongest matching fingerprint.
+    """
+    dois = {row["doi"] for row in rows if row["doi"]}
+    arxiv_ids = {row["arxiv_id"] for row in rows if row["arxiv_id"]}
+    title_fps = {row["title_fingerprint"] for row in rows if row["title_fingerprint"]}
+    result = await db.scalars(
+        select(Paper).where(
+            or_(
+                Paper.doi.in_(dois),
+                Paper.arxiv_id.in_(arxiv_ids),
+                Paper.title_fingerprint.in_(title_fps),
+            )
+        )
+    )
+    by_doi: dict[str, Paper] = {}
+    by_arxiv: dict[str, Paper] = {}
+    by_title: dict[str, Paper] = {}
+    for paper in result.all():
+        if paper.doi:
+            by_doi.setdefault(paper.doi, paper)
+        if paper.arxiv_id:
+            by_arxiv.setdefault(paper.arxiv_id, paper)
+        if paper.title_fingerprint:
+            by_title.setdefault(paper.title_fingerprint, paper)
+
+    matches: list[Optional[Paper]] = [by_doi.get(row["doi"]) or by_arxiv.get(row["arxiv_id"]) for row in rows]
+    claimed = {paper.id for paper in matches if paper is not None}
+    for i, row in enumerate(rows):
+        candidate = by_title.get(row["title_fingerprint"])
+        if matches[i] is not None or candidate is None or candidate.id in claimed:
+            continue
+        # Same title + year but a different registered identifier is a different paper
+        if (row["doi"] and candidate.doi) or (row["arxiv_id"] and candidate.arxiv_id):
+            continue
+        matches[i] = candidate
+    return matches
+
+
+async def save_papers(
     db: AsyncSession,
+    papers_data: list[dict],
     owner_id: uuid.UUID,
-    limit: int = 10,
-) -> list[tuple[Paper, float]]:
-    """
-    Semantic search via ChromaDB, resolve IDs to Paper records.
-    Falls back to PostgreSQL ILIKE keyword search if ChromaDB returns nothing.
-    """
-    results = chroma_svc.search_papers(query, n_results=limit)
-
-    if results:
-        paper_ids = []
-        scores = {}
-        for r in results:
-            pid = r["metadata"].get("paper_id")
-            if pid:
-                paper_ids.append(uuid.UUID(pid))
-                # Convert distance to score (lower distance = higher score)
-                dist = r.get("distance", 1.0)
-                scores[pid] = max(0.0, 1.0 - dist)
-
-        if paper_ids:
-            rows = await db.execute(
-                select(Paper).where(
-                    Paper.id.in_(paper_ids),
-                    Paper.owner_id == owner_id,
-                )
+) -> list[Paper]:
+    """
+    Upsert papers into the shared store by canonical_key and link them into the owner's library.
+    Returns a Paper per input item, in order; call publish_saved() after committing.
+    """
+    if not papers_data:
+        return []
+
+    merged, index = merge_duplicates(papers_data)
+    rows = [_paper_row(paper_data) for paper_data in merged]
+    resolved = await _find_existing(db, rows)
+    await metrics.incr("papers.ingest.existing", sum(1 for paper in resolved if paper is not None))
+
+    pending = [row for row, paper in zip(rows, resolved) if paper is None]
+    if pending:
+        stmt = pg_insert(Paper).values(pending)
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[Paper.canonical_key],
+                # No-op update so RETURNING also yields a concurrently inserted row
+                set_={"canonical_key": stmt.excluded.canonical_key},
             )
-            papers = rows.scalars().all()
-            return [(p, scores.get(str(p.id), 0.5)) for p in papers]
+            .returning(Paper)
+            .execution_options(populate_existing=True)
+        )
+        stored = {p.canonical_key: p for p in (await db.scalars(stmt)).all()}
+        resolved = [paper or stored[row["canonical_key"]] for row, paper in zip(rows, resolved)]
+
+        new_ids = {row["id"] for row in pending}
+        await metrics.incr("papers.ingest.new", sum(1 for p in stored.values() if p.id in new_ids))
+
+    await db.execute(
+        pg_insert(UserPaper)
+        .values([
+            {"id": uuid.uuid4(), "user_id": owner_id, "paper_id": paper_id}
+            for paper_id in dict.fromkeys(p.id for p in resolved)
+        ])
+        .on_conflict_do_nothing(constraint="uq_user_papers_user_paper")
+    )
+
+    return [resolved[i] for i in index]
+
+
+async def save_paper_stream(
+    db: AsyncSession,
+    papers: AsyncIterator[dict],
+    owner_id: uuid.UUID,
+    batch_size: int = 100,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Persist a paper stream through save_papers, committing each batch. Returns the count saved."""
+    total = 0
+    batch: list[dict] = []
+
+    async def _flush() -> None:
+        nonlocal total
+        saved = await save_papers(db, batch, owner_id)
+        await db.commit()
+        await publish_saved(db, owner_id, saved)
+        total += len(saved)
+        if on_progress:
+            on_progress(total)
+        db.expunge_all()
+        batch.clear()
+
+    async for paper in papers:
+        batch.append(paper)
+        if len(batch) >= batch_size:
+            await _flush()
+    if batch:
+        await _flush()
+    return total
+
+
+async def save_paper(db: AsyncSession, paper_data: dict, owner_id: uuid.UUID) -> Paper:
+    """Persist a single paper into the shared store and the owner's library."""
+    return (await save_papers(db, [paper_data], owner_id))[0]
+
+
+# ---------------------------------------------------------------------------
+# User library
+# ---------------------------------------------------------------------------
 
-    # Keyword fallback
-    rows = await db.execute(
+def library_select(owner_id: uuid.UUID) -> Select:
+    """SELECT of the papers in a user's library (add ordering/paging as needed)."""
+    return (
         select(Paper)
-        .where(
-            Paper.owner_id == owner_id,
-            Paper.title.ilike(f"%{query}%"),
+        .join(UserPaper, UserPaper.paper_id == Paper.id)
+        .where(UserPaper.user_id == owner_id)
+    )
+
+
+async def count_library(db: AsyncSession, owner_id: uuid.UUID) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(UserPaper).where(UserPaper.user_id == owner_id)
+    )
+    return result.scalar_one()
+
+
+async def get_library_paper(
+    db: AsyncSession, owner_id: uuid.UUID, paper_id: uuid.UUID
+) -> Optional[Paper]:
+    result = await db.execute(library_select(owner_id).where(Paper.id == paper_id))
+    return result.scalar_one_or_none()
+
+
+async def remove_from_library(db: AsyncSession, owner_id: uuid.UUID, paper_id: uuid.UUID) -> bool:
+    """
+    Unlink a paper from the user's library. The canonical paper and its shared
+    embedding stay, so another user ingesting it later costs no re-embedding.
+    Call search_cache.bump_library_version(owner_id) after committing.
+    """
+    result = await db.execute(
+        delete(UserPaper).where(UserPaper.user_id == owner_id, UserPaper.paper_id == paper_id)
+    )
+    if result.rowcount and settings.CHROMA_TENANT_COLLECTIONS:
+        await vector_store.delete_paper(str(paper_id), vector_store.tenant_collection_name(owner_id))
+    return result.rowcount > 0
+
+
+# Rank constant of reciprocal rank fusion: damps the weight of the very top
+# ranks so a paper found by both retrievers beats one ranked first by only one
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: list[list[uuid.UUID]], k: int = RRF_K) -> dict[uuid.UUID, float]:
+    """Fuse best-first rankings: score(p) = sum over rankings of 1 / (k + rank of p)."""
+    fused: dict[uuid.UUID, float] = {}
+    for ranking in rankings:
+        for rank, paper_id in enumerate(ranking, start=1):
+            fused[paper_id] = fused.get(paper_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+async def _vector_ranking(
+    query: str, db: AsyncSession, owner_id: uuid.UUID, limit: int, filters: dict
+) -> dict[uuid.UUID, float]:
+    """Library papers nearest to the query embedding, best first, scored 1 - distance."""
+    try:
+        query_embedding: Optional[list[float]] = await embeddings.embed_query(query)
+    except Exception as exc:
+        logger.warning("Query embedding failed, letting ChromaDB embed the query: %s", exc)
+        query_embedding = None
+
+    if settings.CHROMA_TENANT_COLLECTIONS:
+        results = await vector_store.search_papers(
+            query,
+            n_results=limit,
+            where=vector_store.paper_filter(**filters),
+            collection=vector_store.tenant_collection_name(owner_id),
+            query_embedding=query_embedding,
         )
-        .limit(limit)
+    else:
+        # Every library paper is considered: the owner filter is split into
+        # bounded paper_id lists, queried concurrently, and the hits merged
+        library_ids = [
+            str(pid) for pid in (
+                await db.scalars(select(UserPaper.paper_id).where(UserPaper.user_id == owner_id))
+            ).all()
+        ]
+        pages = await asyncio.gather(*(
+            vector_store.search_papers(
+                query,
+                n_results=limit,
+                where=vector_store.paper_filter(paper_ids=chunk, **filters),
+                query_embedding=query_embedding,
+            )
+            for chunk in _chunks(library_ids, settings.VECTOR_SEARCH_IDS_PER_QUERY)
+        ))
+        results = [r for page in pages for r in page]
+
+    scores: dict[uuid.UUID, float] = {}
+    for r in sorted(results, key=lambda r: r.get("distance", 1.0))[:limit]:
+        pid = r["metadata"].get("paper_id")
+        if pid:
+            # Convert distance to score (lower distance = higher score)
+            scores.setdefault(uuid.UUID(pid), max(0.0, 1.0 - r.get("distance", 1.0)))
+    return scores
+
+
+def _has_field(field: str):
+    """SQL condition: one of the paper's field_tags normalizes to the same key as `field`."""
+    tag = func.json_array_elements_text(Paper.field_tags).table_valued("value")
+    normalized = func.btrim(func.regexp_replace(func.lower(tag.c.value), "[^a-z0-9]+", "_", "g"), "_")
+    return select(1).select_from(tag).where(normalized == vector_store.field_key(field)[len("field_"):]).exists()
+
+
+async def _keyword_ranking(
+    query: str,
+    db: AsyncSession,
+    owner_id: uuid.UUID,
+    limit: int,
+    field: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    source: Optional[str] = None,
+) -> dict[uuid.UUID, float]:
+    """
+    Full-text matches in the library, best first. The match runs on the
+    GIN-indexed search_vector (title + abstract); score is ts_rank_cd
+    normalized to 0-1 (rank / (rank + 1)).
+    """
+    tsquery = func.websearch_to_tsquery("english", query)
+    rank = func.ts_rank_cd(Paper.search_vector, tsquery, 32)
+    stmt = (
+        select(Paper.id, rank)
+        .join(UserPaper, UserPaper.paper_id == Paper.id)
+        .where(UserPaper.user_id == owner_id, Paper.search_vector.op("@@")(tsquery))
     )
-    return [(p, 0.5) for p in rows.scalars().all()]
+    if field:
+        stmt = stmt.where(_has_field(field))
+    if year_from is not None:
+        stmt = stmt.where(Paper.year >= year_from)
+    if year_to is not None:
+        stmt = stmt.where(Paper.year <= year_to)
+    if source:
+        stmt = stmt.where(Paper.source == source)
+    rows = await db.execute(stmt.order_by(rank.desc(), Paper.id).limit(limit))
+    return {pid: float(score) for pid, score in rows.all()}
+
+
+async def _rank(
+    query: str, db: AsyncSession, owner_id: uuid.UUID, depth: int, mode: str, filters: dict
+) -> dict[uuid.UUID, float]:
+    """Up to `depth` library papers scored for the query, best first (see search_library)."""
+    if mode == "keyword":
+        return await _keyword_ranking(query, db, owner_id, depth, **filters)
+    if mode == "hybrid":
+        rankings = [
+            list(await _keyword_ranking(query, db, owner_id, depth, **filters)),
+            list(await _vector_ranking(query, db, owner_id, depth, filters)),
+        ]
+        best = len(rankings) / (RRF_K + 1)
+        fused = reciprocal_rank_fusion(rankings)
+        top = sorted(fused, key=fused.__getitem__, reverse=True)[:depth]
+        return {pid: fused[pid] / best for pid in top}
+    scores = await _vector_ranking(query, db, owner_id, depth, filters)
+    return scores or await _keyword_ranking(query, db, owner_id, depth, **filters)
+
+
+async def search_library(
+    query: str,
+    db: AsyncSession,
+    owner_id: uuid.UUID,
+    limit: int = 10,
+    mode: str = "semantic",
+    offset: int = 0,
+    field: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    source: Optional[str] = None,
+) -> tuple[list[tuple[Paper, float]], Optional[int]]:
+    """
+    Search the user's library in `mode` (semantic, keyword or hybrid via RRF).
+    Returns one page of (paper, score) and the next page's offset, or None.
+    """
+    filters = {"field": field, "year_from": year_from, "year_to": year_to, "source": source}
+    depth = max(settings.SEARCH_RESULT_DEPTH, limit)
+
+    key = None
+    ranked = None
+    if settings.SEARCH_CACHE_ENABLED:
+        version = await search_cache.library_version(owner_id)
+        if version is not None:
+            key = search_cache.result_key(owner_id, version, query, mode, filters)
+            ranked = await search_cache.get_results(key)
+    if ranked is None:
+        ranked = list((await _rank(query, db, owner_id, depth, mode, filters)).items())
+        if key is not None:
+            await search_cache.set_results(key, ranked)
+
+    page = dict(ranked[offset:offset + limit])
+    next_offset = offset + limit if offset + limit < len(ranked) else None
+    if not page:
+        return [], None
+    rows = await db.execute(library_select(owner_id).where(Paper.id.in_(page)))
+    papers = sorted(rows.scalars().all(), key=lambda p: page[p.id], reverse=True)
+    return [(p, page[p.id]) for p in papers], next_offset
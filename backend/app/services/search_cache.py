@@ -0,0 +1,106 @@
+"""
+Library search cache — ranked search results per owner, shared through Redis.
+
+A search computes up to SEARCH_RESULT_DEPTH ranked (paper id, score) pairs
+once and stores them under
+
+    search:<owner>:v<version>:<sha1 of mode, filters and normalized query>
+
+so repeating a search, or fetching its next page, skips the embed → vector
+query → rank pipeline. Each owner has a library version
+(`search:<owner>:version`) that is bumped whenever papers are linked to or
+unlinked from their library, or finish indexing; keys embed the version, so a
+bump makes every cached result for that owner unreachable at once and the
+stale entries simply expire (SEARCH_CACHE_TTL_SECONDS). The bump must come
+after the change commits: a search running before the commit caches the old
+library under the old version, which the bump then retires.
+
+If Redis is unreachable the cache is bypassed and every search is computed.
+"""
+
+import base64
+import binascii
+import hashlib
+import logging
+import uuid
+from typing import Any, Optional
+
+import orjson
+
+from app.config import get_settings
+from app.db.redis import get_redis
+from app.services import metrics
+from app.services.cache import normalize_query
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_PREFIX = "search"
+
+
+def _version_key(owner_id: uuid.UUID) -> str:
+    return f"{_PREFIX}:{owner_id.hex}:version"
+
+
+async def library_version(owner_id: uuid.UUID) -> Optional[int]:
+    """Current library version of the owner, or None if Redis is unavailable."""
+    try:
+        raw = await get_redis().get(_version_key(owner_id))
+    except Exception as exc:
+        logger.debug("Search cache unavailable: %s", exc)
+        return None
+    return int(raw) if raw is not None else 0
+
+
+async def bump_library_version(owner_id: uuid.UUID) -> None:
+    """Invalidate every cached search of the owner (call after a library change commits)."""
+    try:
+        await get_redis().incr(_version_key(owner_id))
+    except Exception as exc:
+        logger.warning("Could not invalidate search cache for %s: %s", owner_id, exc)
+
+
+def result_key(owner_id: uuid.UUID, version: int, query: str, mode: str, filters: dict[str, Any]) -> str:
+    params = orjson.dumps(
+        {"q": normalize_query(query), "mode": mode, **filters}, option=orjson.OPT_SORT_KEYS
+    )
+    return f"{_PREFIX}:{owner_id.hex}:v{version}:{hashlib.sha1(params).hexdigest()}"
+
+
+async def get_results(key: str) -> Optional[list[tuple[uuid.UUID, float]]]:
+    """Cached ranking (best first), or None on a miss."""
+    try:
+        raw = await get_redis().get(key)
+    except Exception as exc:
+        logger.debug("Search cache unavailable (%s): %s", key, exc)
+        return None
+    if raw is None:
+        await metrics.incr("search_cache.miss")
+        return None
+    await metrics.incr("search_cache.hit")
+    return [(uuid.UUID(pid), score) for pid, score in orjson.loads(raw)]
+
+
+async def set_results(key: str, ranked: list[tuple[uuid.UUID, float]]) -> None:
+    try:
+        payload = orjson.dumps([(str(pid), score) for pid, score in ranked])
+        await get_redis().set(key, payload, ex=settings.SEARCH_CACHE_TTL_SECONDS)
+    except Exception as exc:
+        logger.debug("Search cache write failed (%s): %s", key, exc)
+
+
+def encode_cursor(offset: int) -> str:
+    """Opaque pagination cursor for the result at `offset`."""
+    return base64.urlsafe_b64encode(orjson.dumps({"offset": offset})).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Offset encoded in a cursor. Raises ValueError on a malformed cursor."""
+    try:
+        data = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(data["offset"])
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
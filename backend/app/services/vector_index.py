@@ -0,0 +1,694 @@
+"""
+Local vector index — an in-process alternative to the ChromaDB server
+(VECTOR_BACKEND=local) for single-node deployments, CI and benchmarks.
+
+Each collection lives in VECTOR_INDEX_DIR/<collection>/:
+    header.json    dim, dtype, capacity
+    vectors.bin    memory-mapped matrix with one row per slot — float32, or
+                   int8 (VECTOR_INDEX_DTYPE=int8, 4x smaller) with a float32
+                   per-row scale in scales.bin
+    records.log    append-only orjson lines (upserts with slot, metadata and
+                   document; deletes), replayed on open and compacted once
+                   mostly stale
+    ivf.npy        optional IVF centroids; ivf_lists.bin holds each slot's list
+
+Vectors are L2-normalized on write, so cosine similarity is a dot product:
+a query scores its candidate rows with one matrix-vector product per chunk
+and keeps the top k with argpartition. `where` filters use the Chroma dialect
+built by chroma.paper_filter; a `paper_id $in` clause is resolved through the
+id map first, so library-scoped searches only score the user's own rows.
+With VECTOR_INDEX_IVF_LISTS > 0, unfiltered searches only score the
+VECTOR_INDEX_IVF_PROBE partitions nearest the query.
+
+Opening an index maps the vector file rather than reading it, so start-up
+cost is replaying the record log. Distances are cosine distances (1 - cos).
+
+Several processes (API workers, Celery workers) may open the same
+directory. Writes take an exclusive flock on `.lock`, reads a shared one,
+and each call first catches up with records.log, header.json and ivf.npy
+changes made by other processes (appended records are replayed; a
+compacted log is reloaded), so slots are always allocated from the current
+state. IVF training runs outside the write lock (maybe_train, called after
+upserts): k-means works on a snapshot and only the final list assignment
+holds the lock.
+
+This backend cannot embed text: upserts and queries need precomputed vectors
+(embeddings.embed_documents / embed_query), which the research service
+always supplies.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import orjson
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_MIN_CAPACITY = 1024
+_SCORE_CHUNK_ROWS = 65_536
+_IVF_TRAIN_SAMPLE = 50_000
+_IVF_ITERATIONS = 10
+_IVF_MIN_ROWS_PER_LIST = 32
+
+_OPERATORS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def matches(metadata: dict, where: Optional[dict]) -> bool:
+    """Evaluate a Chroma-style `where` clause against one metadata dict."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            if not all(_OPERATORS[op](value, operand) for op, operand in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def _split_id_filter(where: Optional[dict]) -> tuple[Optional[list[str]], Optional[dict]]:
+    """Pull a top-level `paper_id $in` clause out of `where` -> (ids, remaining filter)."""
+    if not where:
+        return None, None
+    clauses = where["$and"] if list(where) == ["$and"] else [where]
+    ids: Optional[list[str]] = None
+    rest: list[dict] = []
+    for clause in clauses:
+        condition = clause.get("paper_id") if len(clause) == 1 else None
+        if ids is None and isinstance(condition, dict) and list(condition) == ["$in"]:
+            ids = list(condition["$in"])
+        else:
+            rest.append(clause)
+    if not rest:
+        return ids, None
+    return ids, rest[0] if len(rest) == 1 else {"$and": rest}
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class VectorIndex:
+    """
+    One memory-mapped collection. Thread- and process-safe: every public
+    method takes the thread lock and a shared or exclusive flock.
+    """
+
+    def __init__(self, path: Path, dtype: str = "float32", ivf_lists: int = 0, ivf_probe: int = 8) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.ivf_lists = ivf_lists
+        self.ivf_probe = ivf_probe
+        self._lock = threading.RLock()
+        self._lock_file = open(self.path / ".lock", "a+b")
+
+        header = self._read_header()
+        self.dtype: str = header.get("dtype", dtype)
+        self.dim: Optional[int] = header.get("dim")
+        self.capacity: int = header.get("capacity", 0)
+
+        self._vectors: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._lists: Optional[np.memmap] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_rows = 0
+        self._ivf_mtime: Optional[int] = None
+        # Slots written while an IVF training run is in progress (None when idle)
+        self._touched: Optional[set[int]] = None
+
+        self._reset()
+        if self.dim and self.capacity:
+            self._map()
+        with self._locked(exclusive=False):
+            pass
+
+    def _reset(self) -> None:
+        self._slots: dict[str, int] = {}          # id -> slot
+        self._ids: dict[int, str] = {}            # slot -> id
+        self._metadata: dict[int, dict] = {}
+        self._documents: dict[int, str] = {}
+        self._paper_slots: dict[str, int] = {}    # metadata paper_id -> slot
+        self._alive = np.zeros(self.capacity, dtype=bool)
+        self._free: set[int] = set()
+        self._next_slot = 0
+        self._log_lines = 0
+        # records.log position this process has replayed up to
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the thread lock and the directory flock, synced with other processes' writes."""
+        with self._lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self._sync()
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """Catch up with records, growth and IVF training written by other processes."""
+        try:
+            stat = os.stat(self.path / "records.log")
+        except FileNotFoundError:
+            stat = None
+        if stat is not None and (stat.st_ino != self._log_inode or stat.st_size != self._log_offset):
+            header = self._read_header()
+            if stat.st_ino != self._log_inode:
+                # New, compacted or cleared log: reload everything from disk
+                self.flush()
+                self.dim = header.get("dim")
+                self.capacity = header.get("capacity", 0)
+                self._vectors = self._scales = self._lists = None
+                if self.dim and self.capacity:
+                    self._map()
+                self._reset()
+                self._replay()
+                self._free = set(range(self._next_slot)) - set(self._ids)
+            else:
+                if self.dim is None:
+                    self.dim = header.get("dim")
+                if header.get("capacity", 0) > self.capacity:
+                    self._grow(header["capacity"])
+                self._replay()
+        self._load_ivf()
+
+    # -- persistence --------------------------------------------------------
+
+    def _read_header(self) -> dict:
+        try:
+            return json.loads((self.path / "header.json").read_text())
+        except FileNotFoundError:
+            return {}
+
+    def _write_header(self) -> None:
+        tmp = self.path / "header.json.tmp"
+        tmp.write_text(json.dumps({"dim": self.dim, "dtype": self.dtype, "capacity": self.capacity}))
+        os.replace(tmp, self.path / "header.json")
+
+    def _mapped(self, name: str, dtype: Any, shape: tuple[int, ...]) -> np.memmap:
+        file = self.path / name
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(file, "ab") as fh:
+            if fh.tell() < size:
+                fh.truncate(size)
+        return np.memmap(file, dtype=dtype, mode="r+", shape=shape)
+
+    def _map(self) -> None:
+        storage = np.int8 if self.dtype == "int8" else np.float32
+        self._vectors = self._mapped("vectors.bin", storage, (self.capacity, self.dim))
+        if self.dtype == "int8":
+            self._scales = self._mapped("scales.bin", np.float32, (self.capacity,))
+        if self.ivf_lists:
+            self._lists = self._mapped("ivf_lists.bin", np.int32, (self.capacity,))
+
+    def _grow(self, needed: int) -> None:
+        """Enlarge to at least `needed` slots, or adopt a capacity another process already grew to."""
+        if needed <= self.capacity:
+            return
+        header_capacity = self._read_header().get("capacity", 0)
+        self.flush()
+        if needed <= header_capacity:
+            self.capacity = header_capacity
+        else:
+            self.capacity = max(needed, self.capacity * 2, _MIN_CAPACITY)
+        self._vectors = self._scales = self._lists = None
+        if self.dim:
+            self._map()
+        alive = np.zeros(self.capacity, dtype=bool)
+        alive[: len(self._alive)] = self._alive
+        self._alive = alive
+        if self.capacity > header_capacity:
+            self._write_header()
+
+    def _replay(self) -> None:
+        """Apply records appended to records.log since the last replay."""
+        log = self.path / "records.log"
+        if not log.exists():
+            return
+        with open(log, "rb") as fh:
+            self._log_inode = os.fstat(fh.fileno()).st_ino
+            fh.seek(self._log_offset)
+            for line in fh:
+                if not line.strip():
+                    continue
+                record = orjson.loads(line)
+                self._log_lines += 1
+                if "u" in record:
+                    self._place(record["u"], record["s"], record["m"], record["d"])
+                else:
+                    self._remove(record["x"])
+            self._log_offset = fh.tell()
+
+    def _append_log(self, records: list[dict]) -> None:
+        with open(self.path / "records.log", "ab") as fh:
+            fh.write(b"".join(orjson.dumps(r) + b"\n" for r in records))
+            self._log_inode = os.fstat(fh.fileno()).st_ino
+            self._log_offset = fh.tell()
+        self._log_lines += len(records)
+        if self._log_lines > 2 * len(self._slots) + 1000:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.path / "records.log.tmp"
+        with open(tmp, "wb") as fh:
+            for slot, record_id in self._ids.items():
+                fh.write(orjson.dumps(
+                    {"u": record_id, "s": slot, "m": self._metadata[slot], "d": self._documents.get(slot, "")}
+                ) + b"\n")
+        os.replace(tmp, self.path / "records.log")
+        stat = os.stat(self.path / "records.log")
+        self._log_inode, self._log_offset = stat.st_ino, stat.st_size
+        self._log_lines = len(self._ids)
+
+    def flush(self) -> None:
+        for array in (self._vectors, self._scales, self._lists):
+            if array is not None:
+                array.flush()
+
+    # -- bookkeeping --------------------------------------------------------
+
+    def _place(self, record_id: str, slot: int, metadata: dict, document: str) -> None:
+        if record_id in self._slots and self._slots[record_id] != slot:
+            self._remove(record_id)
+        self._slots[record_id] = slot
+        self._ids[slot] = record_id
+        self._metadata[slot] = metadata
+        self._documents[slot] = document
+        if metadata.get("paper_id"):
+            self._paper_slots[metadata["paper_id"]] = slot
+        if slot >= len(self._alive):
+            self._grow(slot + 1)
+        self._alive[slot] = True
+        self._free.discard(slot)
+        self._next_slot = max(self._next_slot, slot + 1)
+        if self._touched is not None:
+            self._touched.add(slot)
+
+    def _remove(self, record_id: str) -> Optional[int]:
+        slot = self._slots.pop(record_id, None)
+        if slot is None:
+            return None
+        self._ids.pop(slot, None)
+        metadata = self._metadata.pop(slot, {})
+        self._documents.pop(slot, None)
+        if self._paper_slots.get(metadata.get("paper_id")) == slot:
+            del self._paper_slots[metadata["paper_id"]]
+        if slot < len(self._alive):
+            self._alive[slot] = False
+        self._free.add(slot)
+        return slot
+
+    def _allocate(self, record_id: str) -> int:
+        if record_id in self._slots:
+            return self._slots[record_id]
+        if self._free:
+            return self._free.pop()
+        self._next_slot += 1
+        return self._next_slot - 1
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # -- writes -------------------------------------------------------------
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+        documents: Optional[list[str]] = None,
+    ) -> None:
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        documents = documents or [""] * len(ids)
+        with self._locked(exclusive=True):
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._write_header()
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dim}")
+            slots = [self._allocate(record_id) for record_id in ids]
+            self._grow(max(slots) + 1)
+            if self._vectors is None:
+                self._map()
+
+            if self.dtype == "int8":
+                scales = np.abs(vectors).max(axis=1) / 127
+                scales[scales == 0] = 1.0
+                self._vectors[slots] = np.round(vectors / scales[:, None]).astype(np.int8)
+                self._scales[slots] = scales
+            else:
+                self._vectors[slots] = vectors
+            if self._centroids is not None:
+                self._lists[slots] = np.argmax(vectors @ self._centroids.T, axis=1)
+            self.flush()
+
+            records = []
+            for record_id, slot, metadata, document in zip(ids, slots, metadatas, documents):
+                self._place(record_id, slot, metadata or {}, document or "")
+                records.append({"u": record_id, "s": slot, "m": metadata or {}, "d": document or ""})
+            self._append_log(records)
+
+    def delete(self, ids: list[str]) -> None:
+        with self._locked(exclusive=True):
+            removed = [record_id for record_id in ids if self._remove(record_id) is not None]
+            if removed:
+                self._append_log([{"x": record_id} for record_id in removed])
+
+    def clear(self) -> None:
+        """Remove every row and forget the dimension (e.g. before refilling with another embedding model)."""
+        with self._locked(exclusive=True):
+            self.dim, self.capacity = None, 0
+            self._vectors = self._scales = self._lists = None
+            self._centroids, self._ivf_mtime, self._trained_rows = None, None, 0
+            for name in ("vectors.bin", "scales.bin", "ivf_lists.bin", "ivf.npy"):
+                (self.path / name).unlink(missing_ok=True)
+            self._write_header()
+            # A new (empty) log file makes other processes reload from scratch
+            tmp = self.path / "records.log.tmp"
+            tmp.write_bytes(b"")
+            os.replace(tmp, self.path / "records.log")
+            self._reset()
+            self._log_inode = os.stat(self.path / "records.log").st_ino
+
+    # -- reads --------------------------------------------------------------
+
+    def _dequantized(self, slots: np.ndarray) -> np.ndarray:
+        rows = np.asarray(self._vectors[slots], dtype=np.float32)
+        if self.dtype == "int8":
+            rows *= self._scales[slots][:, None]
+        return rows
+
+    def get(self, ids: list[str]) -> list[tuple[str, list[float], dict, str]]:
+        """(id, vector, metadata, document) for every stored id, in request order."""
+        with self._locked(exclusive=False):
+            found = [(record_id, self._slots[record_id]) for record_id in ids if record_id in self._slots]
+            if not found:
+                return []
+            vectors = self._dequantized(np.array([slot for _, slot in found]))
+            return [
+                (record_id, vector.tolist(), self._metadata[slot], self._documents.get(slot, ""))
+                for (record_id, slot), vector in zip(found, vectors)
+            ]
+
+    def contains(self, ids: list[str]) -> set[str]:
+        with self._locked(exclusive=False):
+            return {record_id for record_id in ids if record_id in self._slots}
+
+    def list_ids(self, offset: int, limit: int) -> list[str]:
+        """Stored ids in slot order (stable between writes), for paging."""
+        with self._locked(exclusive=False):
+            return [self._ids[slot] for slot in sorted(self._ids)[offset:offset + limit]]
+
+    def _candidates(self, where: Optional[dict], query: np.ndarray) -> np.ndarray:
+        ids, rest = _split_id_filter(where)
+        if ids is not None:
+            slots = [self._paper_slots[pid] for pid in ids if pid in self._paper_slots]
+        elif self._centroids is not None and rest is None:
+            probe = np.argsort(-(self._centroids @ query))[: self.ivf_probe]
+            in_lists = np.isin(self._lists[: self._next_slot], probe)
+            return np.flatnonzero(in_lists & self._alive[: self._next_slot])
+        else:
+            slots = np.flatnonzero(self._alive[: self._next_slot]).tolist()
+        if rest is not None:
+            slots = [slot for slot in slots if matches(self._metadata[slot], rest)]
+        return np.asarray(slots, dtype=np.int64)
+
+    def query(self, embedding: list[float], n_results: int = 10, where: Optional[dict] = None) -> list[dict]:
+        """Top-k by cosine similarity -> [{chroma_id, distance, metadata}] best first."""
+        with self._locked(exclusive=False):
+            if not self._slots or self._vectors is None:
+                return []
+            query = _normalize(np.asarray([embedding], dtype=np.float32))[0]
+            candidates = self._candidates(where, query)
+            if candidates.size == 0:
+                return []
+            k = min(n_results, candidates.size)
+            best_slots = np.empty(0, dtype=np.int64)
+            best_scores = np.empty(0, dtype=np.float32)
+            for start in range(0, candidates.size, _SCORE_CHUNK_ROWS):
+                chunk = candidates[start:start + _SCORE_CHUNK_ROWS]
+                scores = self._dequantized(chunk) @ query
+                slots = np.concatenate([best_slots, chunk])
+                scores = np.concatenate([best_scores, scores])
+                if scores.size > k:
+                    keep = np.argpartition(-scores, k - 1)[:k]
+                    slots, scores = slots[keep], scores[keep]
+                best_slots, best_scores = slots, scores
+            order = np.argsort(-best_scores)
+            return [
+                {
+                    "chroma_id": self._ids[int(slot)],
+                    "distance": max(0.0, float(1.0 - score)),
+                    "metadata": self._metadata[int(slot)],
+                }
+                for slot, score in zip(best_slots[order], best_scores[order])
+            ]
+
+    # -- IVF ----------------------------------------------------------------
+
+    def _load_ivf(self) -> None:
+        """(Re)load the centroids if ivf.npy appeared, was retrained or was removed since the last look."""
+        file = self.path / "ivf.npy"
+        if not self.ivf_lists:
+            return
+        if not file.exists():
+            self._centroids, self._ivf_mtime = None, None
+            return
+        mtime = file.stat().st_mtime_ns
+        if mtime == self._ivf_mtime:
+            return
+        if self._lists is None and self.dim and self.capacity:
+            self._lists = self._mapped("ivf_lists.bin", np.int32, (self.capacity,))
+        if self._lists is not None:
+            self._centroids = np.load(file)
+            self._trained_rows = len(self._slots)
+            self._ivf_mtime = mtime
+
+    def maybe_train(self) -> None:
+        """Train the IVF partitions once there are enough rows, and retrain when the index has doubled."""
+        if not self.ivf_lists:
+            return
+        with self._locked(exclusive=False):
+            rows = len(self._slots)
+            due = rows >= self.ivf_lists * _IVF_MIN_ROWS_PER_LIST and (
+                self._centroids is None or rows > 2 * self._trained_rows
+            )
+        if due:
+            self.train_ivf()
+
+    def train_ivf(self) -> None:
+        """
+        (Re)build IVF partitions with spherical k-means over a sample of the
+        rows. Clustering and the bulk list assignment run without the index
+        lock; rows written meanwhile are reassigned under the write lock at
+        the end. Returns immediately if another process is already training.
+        """
+        with open(self.path / ".train.lock", "a+b") as guard:
+            try:
+                fcntl.flock(guard, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            try:
+                self._train()
+            finally:
+                fcntl.flock(guard, fcntl.LOCK_UN)
+
+    def _train(self) -> None:
+        with self._locked(exclusive=False):
+            alive = np.flatnonzero(self._alive[: self._next_slot])
+            lists = min(self.ivf_lists, alive.size)
+            if lists == 0:
+                return
+            rng = np.random.default_rng(0)
+            sample = self._dequantized(np.sort(rng.choice(alive, min(alive.size, _IVF_TRAIN_SAMPLE), replace=False)))
+            vectors, scales = self._vectors, self._scales
+            self._touched = set()
+
+        try:
+            centroids = sample[rng.choice(len(sample), lists, replace=False)]
+            for _ in range(_IVF_ITERATIONS):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(lists):
+                    members = sample[assignment == c]
+                    if len(members):
+                        centroids[c] = members.mean(axis=0)
+                centroids = _normalize(centroids)
+
+            # Rows overwritten while this runs are in _touched and reassigned below
+            assigned = np.empty(alive.size, dtype=np.int32)
+            for start in range(0, alive.size, _SCORE_CHUNK_ROWS):
+                chunk = alive[start:start + _SCORE_CHUNK_ROWS]
+                rows = np.asarray(vectors[chunk], dtype=np.float32)
+                if scales is not None:
+                    rows *= scales[chunk][:, None]
+                assigned[start:start + len(chunk)] = np.argmax(rows @ centroids.T, axis=1)
+
+            with self._locked(exclusive=True):
+                if self._lists is None:
+                    self._lists = self._mapped("ivf_lists.bin", np.int32, (self.capacity,))
+                self._lists[alive] = assigned
+                touched = np.array(sorted(s for s in self._touched if self._alive[s]), dtype=np.int64)
+                if touched.size:
+                    self._lists[touched] = np.argmax(self._dequantized(touched) @ centroids.T, axis=1)
+                self._lists.flush()
+                tmp = self.path / "ivf.tmp.npy"
+                np.save(tmp, centroids)
+                os.replace(tmp, self.path / "ivf.npy")
+                self._centroids = centroids
+                self._trained_rows = len(self._slots)
+                self._ivf_mtime = (self.path / "ivf.npy").stat().st_mtime_ns
+        finally:
+            self._touched = None
+
+
+# ---------------------------------------------------------------------------
+# Backend API (mirrors app.services.chroma; used through vector_store)
+# ---------------------------------------------------------------------------
+
+_indexes: dict[str, VectorIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def get_index(name: str) -> VectorIndex:
+    with _registry_lock:
+        if name not in _indexes:
+            _indexes[name] = VectorIndex(
+                Path(settings.VECTOR_INDEX_DIR) / name,
+                dtype=settings.VECTOR_INDEX_DTYPE,
+                ivf_lists=settings.VECTOR_INDEX_IVF_LISTS,
+                ivf_probe=settings.VECTOR_INDEX_IVF_PROBE,
+            )
+        return _indexes[name]
+
+
+def init_index() -> bool:
+    """Open (map) the research and documents indexes."""
+    try:
+        get_index(settings.CHROMA_COLLECTION_RESEARCH)
+        get_index(settings.CHROMA_COLLECTION_DOCUMENTS)
+        return True
+    except Exception as exc:
+        logger.error("Local vector index could not be opened: %s", exc)
+        return False
+
+
+def upsert_papers(
+    items: list[dict],
+    embeddings: Optional[list[list[float]]] = None,
+    collection: Optional[str] = None,
+) -> bool:
+    from app.services.chroma import paper_document
+
+    if not items:
+        return True
+    if embeddings is None:
+        logger.error("Local vector index needs precomputed embeddings (%d papers skipped)", len(items))
+        return False
+    try:
+        index = get_index(collection or settings.CHROMA_COLLECTION_RESEARCH)
+        index.upsert(
+            ids=[item["chroma_id"] for item in items],
+            embeddings=embeddings,
+            metadatas=[item["metadata"] for item in items],
+            documents=[paper_document(item["title"], item["abstract"]) for item in items],
+        )
+    except Exception as exc:
+        logger.error("Local vector index upsert failed (%d papers): %s", len(items), exc)
+        return False
+    try:
+        index.maybe_train()
+    except Exception as exc:
+        logger.error("Local vector index IVF training failed: %s", exc)
+    return True
+
+
+def search_papers(
+    query: str,
+    n_results: int = 10,
+    where: Optional[dict] = None,
+    collection: Optional[str] = None,
+    query_embedding: Optional[list[float]] = None,
+) -> list[dict]:
+    if query_embedding is None:
+        logger.warning("Local vector index cannot embed query text; no query embedding supplied")
+        return []
+    try:
+        index = get_index(collection or settings.CHROMA_COLLECTION_RESEARCH)
+        return index.query(query_embedding, n_results=max(n_results, 1), where=where)
+    except Exception as exc:
+        logger.error("Local vector index search failed: %s", exc)
+        return []
+
+
+def delete_paper(chroma_id: str, collection: Optional[str] = None) -> None:
+    try:
+        get_index(collection or settings.CHROMA_COLLECTION_RESEARCH).delete([chroma_id])
+    except Exception as exc:
+        logger.error("Local vector index delete failed for %s: %s", chroma_id, exc)
+
+
+def list_ids(offset: int, limit: int, collection: Optional[str] = None) -> list[str]:
+    return get_index(collection or settings.CHROMA_COLLECTION_RESEARCH).list_ids(offset, limit)
+
+
+def existing_ids(ids: list[str], collection: Optional[str] = None) -> set[str]:
+    return get_index(collection or settings.CHROMA_COLLECTION_RESEARCH).contains(ids)
+
+
+def delete_papers(ids: list[str], collection: Optional[str] = None) -> None:
+    get_index(collection or settings.CHROMA_COLLECTION_RESEARCH).delete(ids)
+
+
+def clear_collection(name: str) -> None:
+    get_index(name).clear()
+
+
+def copy_papers(chroma_ids: list[str], target: str, source: Optional[str] = None) -> bool:
+    if not chroma_ids:
+        return True
+    try:
+        rows = get_index(source or settings.CHROMA_COLLECTION_RESEARCH).get(chroma_ids)
+        if rows:
+            index = get_index(target)
+            index.upsert(
+                ids=[row[0] for row in rows],
+                embeddings=[row[1] for row in rows],
+                metadatas=[row[2] for row in rows],
+                documents=[row[3] for row in rows],
+            )
+            index.maybe_train()
+        return True
+    except Exception as exc:
+        logger.error("Local vector index copy into %s failed: %s", target, exc)
+        return False
@@ -0,0 +1,176 @@
+"""
+Vector store — the async interface the research service uses for embeddings.
+
+VECTOR_BACKEND selects the backend module: "chroma" (the ChromaDB server,
+app.services.chroma) or "local" (the in-process memory-mapped index,
+app.services.vector_index). Both expose the same synchronous functions.
+
+Every call is run on a bounded thread pool (VECTOR_STORE_MAX_WORKERS threads)
+and awaited, so a slow upsert or query never blocks the event loop serving
+other requests. When the pool is saturated further calls queue for a thread
+instead of spawning more. Each operation's latency is recorded as
+`vector_store.<op>_seconds`.
+
+The shared research collection is addressed through an alias: Redis key
+`vector_store:alias:<CHROMA_COLLECTION_RESEARCH>` names the physical
+collection currently serving reads and writes (the reindex job builds a new
+one and switches the alias in a single SET). Without an alias the collection
+is CHROMA_COLLECTION_RESEARCH itself; if Redis is unreachable the last
+resolved name is used.
+
+Filter and metadata helpers (paper_filter, field_flags, ...) live in the
+backend module and are re-exported here.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import Any, Optional, TypeVar
+
+from app.config import get_settings
+from app.db.redis import get_redis
+from app.services import chroma as chroma_svc
+from app.services import metrics, vector_index
+from app.services.chroma import (  # noqa: F401  (re-exported)
+    field_flags,
+    field_key,
+    paper_document,
+    paper_filter,
+    tenant_collection_name,
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_active_collection: Optional[str] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.VECTOR_STORE_MAX_WORKERS,
+            thread_name_prefix="vector-store",
+        )
+    return _executor
+
+
+async def _call(op: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_executor(), functools.partial(fn, *args, **kwargs)
+        )
+    finally:
+        await metrics.observe(f"vector_store.{op}_seconds", time.perf_counter() - started)
+
+
+def backend() -> ModuleType:
+    """The configured backend module."""
+    if settings.VECTOR_BACKEND == "local":
+        return vector_index
+    return chroma_svc
+
+
+def warm() -> bool:
+    """Open the backend connection and collections (blocking; for worker init)."""
+    if settings.VECTOR_BACKEND == "local":
+        return vector_index.init_index()
+    return chroma_svc.init_chroma()
+
+
+async def init() -> bool:
+    """Open the backend connection and collections without blocking the loop."""
+    return await _call("init", warm)
+
+
+def _alias_key() -> str:
+    return f"vector_store:alias:{settings.CHROMA_COLLECTION_RESEARCH}"
+
+
+async def active_collection() -> str:
+    """Physical name of the shared research collection currently in service."""
+    global _active_collection
+    try:
+        raw = await get_redis().get(_alias_key())
+        _active_collection = raw.decode() if raw else settings.CHROMA_COLLECTION_RESEARCH
+    except Exception as exc:
+        logger.debug("Vector store alias unavailable: %s", exc)
+    return _active_collection or settings.CHROMA_COLLECTION_RESEARCH
+
+
+async def switch_collection(name: str) -> Optional[str]:
+    """Point the research alias at `name` (atomic). Returns the previous collection."""
+    global _active_collection
+    previous = await get_redis().set(_alias_key(), name, get=True)
+    _active_collection = name
+    return previous.decode() if previous else settings.CHROMA_COLLECTION_RESEARCH
+
+
+async def upsert_papers(
+    items: list[dict],
+    embeddings: Optional[list[list[float]]] = None,
+    collection: Optional[str] = None,
+) -> bool:
+    return await _call(
+        "upsert", backend().upsert_papers, items, embeddings, collection or await active_collection()
+    )
+
+
+async def search_papers(
+    query: str,
+    n_results: int = 10,
+    where: Optional[dict] = None,
+    collection: Optional[str] = None,
+    query_embedding: Optional[list[float]] = None,
+) -> list[dict]:
+    return await _call(
+        "search",
+        backend().search_papers,
+        query,
+        n_results=n_results,
+        where=where,
+        collection=collection or await active_collection(),
+        query_embedding=query_embedding,
+    )
+
+
+async def delete_paper(chroma_id: str, collection: Optional[str] = None) -> None:
+    await _call("delete", backend().delete_paper, chroma_id, collection or await active_collection())
+
+
+async def copy_papers(chroma_ids: list[str], target: str) -> bool:
+    """Copy vectors from the shared research collection into `target`."""
+    return await _call("copy", backend().copy_papers, chroma_ids, target, await active_collection())
+
+
+async def clear_collection(name: str) -> None:
+    """Empty a collection and forget its embedding dimension. Raises on failure."""
+    await _call("clear", backend().clear_collection, name)
+
+
+async def list_ids(offset: int, limit: int, collection: Optional[str] = None) -> list[str]:
+    return await _call("list", backend().list_ids, offset, limit, collection or await active_collection())
+
+
+async def existing_ids(ids: list[str], collection: Optional[str] = None) -> set[str]:
+    return await _call("get", backend().existing_ids, ids, collection or await active_collection())
+
+
+async def delete_papers(ids: list[str], collection: Optional[str] = None) -> None:
+    await _call("delete", backend().delete_papers, ids, collection or await active_collection())
+
+
+def shutdown() -> None:
+    """Stop the worker threads (call on process shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -3,14 +3,28 @@ Mining AI Platform - Celery Application Instance.
 
 Configures the Celery app with Redis broker and result backend.
 All task modules must be listed in `include` so Celery discovers them.
+
+Each worker process keeps one persistent asyncio event loop (see run_async)
+so process-wide async resources such as the pooled HTTP clients and the
+shared Anthropic client can be reused across tasks instead of being rebuilt
+by every asyncio.run() call.
+The ChromaDB client and collection handles are likewise opened once per
+worker process.
 """
 
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, Optional, TypeVar
+
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from app.config import get_settings
 
 settings = get_settings()
 
+T = TypeVar("T")
+
 celery_app = Celery(
     "mining_ai",
     broker=settings.CELERY_BROKER_URL,
@@ -39,11 +53,70 @@ celery_app.conf.update(
     # Retry defaults
     task_default_retry_delay=60,
     task_max_retries=3,
-    # Beat schedule (add periodic tasks here in later weeks)
-    beat_schedule={},
+    # Beat schedule
+    beat_schedule={
+        "index-pending-papers": {
+            "task": "mining_ai.research.index_pending",
+            "schedule": settings.INDEXING_SWEEP_INTERVAL_SECONDS,
+            "kwargs": {"retry_failed": True},
+            "options": {"expires": settings.INDEXING_SWEEP_INTERVAL_SECONDS},
+        },
+        "reconcile-vector-index": {
+            "task": "mining_ai.research.reconcile_vectors",
+            "schedule": settings.RECONCILE_INTERVAL_SECONDS,
+            "options": {"expires": settings.RECONCILE_INTERVAL_SECONDS},
+        },
+    },
 )
 
 
+# ---------------------------------------------------------------------------
+# Worker process lifecycle
+# ---------------------------------------------------------------------------
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on this worker process's persistent event loop."""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs: Any) -> None:
+    """Open process-wide clients once per forked worker."""
+    from app.services import http as http_svc
+    from app.services import llm, vector_store
+    from app.services.research import UPSTREAM_URLS
+
+    http_svc.init_http_clients(*UPSTREAM_URLS)
+    llm.init_llm_client()
+    vector_store.warm()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs: Any) -> None:
+    from app.db.redis import close_redis
+    from app.services import embeddings
+    from app.services import http as http_svc
+    from app.services import llm, vector_store
+
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    _worker_loop.run_until_complete(http_svc.close_http_clients())
+    _worker_loop.run_until_complete(llm.close_llm_client())
+    _worker_loop.run_until_complete(embeddings.close_embeddings())
+    vector_store.shutdown()
+    _worker_loop.run_until_complete(close_redis())
+    _worker_loop.close()
+    _worker_loop = None
+
+
 @celery_app.task(bind=True, name="mining_ai.health_check")
 def health_check_task(self) -> dict:
     """Simple task to verify Celery worker is operational."""
@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime, timezone
 
 from app.config import get_settings
-from app.tasks.celery_app import celery_app
+from app.tasks.celery_app import celery_app, run_async
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -22,14 +22,29 @@ def generate_all_sections_task(
 ) -> dict:
     """
     Celery task: generate every section of an AcademicDocument using Claude.
-    Updates the document record in Postgres as each section completes.
+
+    Up to DOCUMENT_SECTION_CONCURRENCY sections are generated at once, so a
+    document takes roughly as long as its slowest sections rather than the
+    sum of all of them. Each finished section is committed as it arrives,
+    with sections kept in the field's order.
+
+    The document context (system prompt) is built once and shared by every
+    section. When it is long enough to be prompt-cached, the first section is
+    generated alone so the cache is written before the others start and all
+    of them read the cached prefix instead of re-processing it.
     """
     from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
     from sqlalchemy import select
 
     from app.models.document import AcademicDocument
-    from app.models.paper import Paper
-    from app.services.document import generate_section, build_references_section, SECTIONS_BY_FIELD
+    from app.services.research import library_select
+    from app.services.document import (
+        SECTIONS_BY_FIELD,
+        build_document_context,
+        build_references_section,
+        generate_section,
+        is_cacheable,
+    )
 
     async def _run() -> dict:
         engine = create_async_engine(settings.DATABASE_URL, echo=False)
@@ -55,7 +70,7 @@ def generate_all_sections_task(
 
             # Load user's papers for context
             papers_result = await db.execute(
-                select(Paper).where(Paper.owner_id == owner_uuid).limit(10)
+                library_select(owner_uuid).limit(10)
             )
             papers = list(papers_result.scalars().all())
 
@@ -64,37 +79,68 @@ def generate_all_sections_task(
 
             sections_data = dict(doc.sections) if doc.sections else {}
 
+            def _ordered() -> dict:
+                """Sections in the field's order, followed by any others already stored."""
+                ordered = {name: sections_data[name] for name in sections_list if name in sections_data}
+                return {**ordered, **sections_data}
+
+            context = build_document_context(project_title, field, papers)
+            semaphore = asyncio.Semaphore(settings.DOCUMENT_SECTION_CONCURRENCY)
+            # Set once the first section's call has written the prompt cache
+            cache_warm = asyncio.Event()
+            if not is_cacheable(context):
+                cache_warm.set()
+
+            async def _generate(section_name: str, first: bool) -> tuple[str, str]:
+                if not first:
+                    await cache_warm.wait()
+                async with semaphore:
+                    try:
+                        content = await generate_section(
+                            document=doc,
+                            section_name=section_name,
+                            project_title=project_title,
+                            field=field,
+                            papers=papers,
+                            context=context,
+                        )
+                    except Exception as exc:
+                        raise RuntimeError(f"{section_name}: {exc}") from exc
+                    finally:
+                        cache_warm.set()
+                return section_name, content
+
+            pending = []
             for section_name in sections_list:
                 if section_name == "references":
-                    ref_text = build_references_section(papers, doc.citation_style)
                     sections_data["references"] = {
-                        "content": ref_text,
+                        "content": build_references_section(papers, doc.citation_style),
                         "generated_at": datetime.now(timezone.utc).isoformat(),
                     }
                     generated_count += 1
-                    continue
+                else:
+                    pending.append(asyncio.ensure_future(_generate(section_name, first=not pending)))
+
+            for finished in asyncio.as_completed(pending):
                 try:
-                    content = await generate_section(
-                        document=doc,
-                        section_name=section_name,
-                        project_title=project_title,
-                        field=field,
-                        papers=papers,
-                    )
-                    sections_data[section_name] = {
-                        "content": content,
-                        "generated_at": datetime.now(timezone.utc).isoformat(),
-                    }
-                    generated_count += 1
+                    section_name, content = await finished
                 except Exception as exc:
-                    logger.error("Section %s generation failed: %s", section_name, exc)
-                    errors.append(f"{section_name}: {exc}")
-
-            doc.sections = sections_data
+                    logger.error("Section generation failed: %s", exc)
+                    errors.append(str(exc))
+                    continue
+                sections_data[section_name] = {
+                    "content": content,
+                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                }
+                generated_count += 1
+                doc.sections = _ordered()
+                await db.commit()
+
+            doc.sections = _ordered()
             doc.status = "error" if errors else "complete"
             await db.commit()
 
         await engine.dispose()
         return {"generated": generated_count, "errors": errors}
 
-    return asyncio.run(_run())
+    return run_async(_run())
@@ -1,11 +1,10 @@
 """Celery tasks for AI prototype code generation."""
 
-import asyncio
 import logging
 import uuid
 
 from app.config import get_settings
-from app.tasks.celery_app import celery_app
+from app.tasks.celery_app import celery_app, run_async
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -56,4 +55,4 @@ def build_prototype_task(self, prototype_id: str) -> dict:
         await engine.dispose()
         return {"status": proto.status}
 
-    return asyncio.run(_run())
+    return run_async(_run())
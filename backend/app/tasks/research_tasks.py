@@ -1,4 +1,4 @@
-"""Celery tasks for bulk research paper ingestion."""
+"""Celery tasks for bulk research paper ingestion and vector index maintenance."""
 
 import asyncio
 import logging
@@ -10,7 +10,7 @@ from sqlalchemy.orm import Session
 from app.config import get_settings
 from app.models.paper import Paper
 from app.services import chroma as chroma_svc
-from app.tasks.celery_app import celery_app
+from app.tasks.celery_app import celery_app, run_async
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -19,34 +19,190 @@ settings = get_settings()
 @celery_app.task(bind=True, name="mining_ai.research.bulk_ingest")
 def bulk_ingest_task(self, queries: list[str], owner_id: str, limit_per_query: int = 5) -> dict:
     """
-    Celery task: run multiple Semantic Scholar + arXiv searches,
-    persist results, and index in ChromaDB.
+    Celery task: fan each query out to every registered source,
+    persist results, and queue them for indexing.
 
-    Runs inside the Celery worker (sync context using asyncio.run).
+    Runs inside the Celery worker on its persistent event loop (run_async).
     """
-    from app.services.research import search_semantic_scholar, search_arxiv, save_paper
+    from app.services.research import publish_saved, save_papers, search_all_sources
     from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-    ingested = 0
-    errors = []
+    progress: dict = {
+        "owner_id": owner_id,
+        "total_queries": len(queries),
+        "queries_done": 0,
+        "papers_ingested": 0,
+        "errors": [],
+    }
+
+    def _report() -> None:
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta=progress)
 
     async def _run():
-        nonlocal ingested
         engine = create_async_engine(settings.DATABASE_URL, echo=False)
         async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
         uid = uuid.UUID(owner_id)
-        async with async_session() as db:
-            for query in queries:
-                for source_fn in [search_semantic_scholar, search_arxiv]:
+        semaphore = asyncio.Semaphore(settings.BULK_INGEST_CONCURRENCY)
+        finished: asyncio.Queue[list[dict]] = asyncio.Queue()
+
+        async def _search(query: str) -> None:
+            papers_data: list[dict] = []
+            async with semaphore:
+                try:
+                    papers_data, statuses = await search_all_sources(query, limit=limit_per_query)
+                    progress["errors"].extend(
+                        f"{s['source']} ({query}): {s['detail']}"
+                        for s in statuses if s["status"] != "ok"
+                    )
+                except Exception as exc:
+                    progress["errors"].append(f"{query}: {exc}")
+            await finished.put(papers_data)
+
+        async def _write() -> None:
+            async with async_session() as db:
+                while progress["queries_done"] < len(queries):
+                    batch = [await finished.get()]
+                    while not finished.empty():
+                        batch.append(finished.get_nowait())
                     try:
-                        papers_data = await source_fn(query, limit=limit_per_query)
-                        for pdata in papers_data:
-                            await save_paper(db, pdata, uid)
-                            ingested += 1
+                        saved = await save_papers(db, [p for papers in batch for p in papers], uid)
+                        await db.commit()
+                        await publish_saved(db, uid, saved)
+                        progress["papers_ingested"] += len({paper.id for paper in saved})
                     except Exception as exc:
-                        errors.append(str(exc))
-            await db.commit()
-        await engine.dispose()
+                        await db.rollback()
+                        progress["errors"].append(f"persist: {exc}")
+                    db.expunge_all()
+                    progress["queries_done"] += len(batch)
+                    _report()
+
+        try:
+            _report()
+            await asyncio.gather(_write(), *(_search(q) for q in queries))
+        finally:
+            await engine.dispose()
+
+    run_async(_run())
+    return {"ingested": progress["papers_ingested"], **progress}
+
+
+@celery_app.task(bind=True, name="mining_ai.research.harvest_arxiv")
+def harvest_arxiv_task(self, query: str, owner_id: str, max_results: int = 1000) -> dict:
+    """
+    Celery task: page through a large arXiv result set and stream the entries
+    into the library in committed batches (institutional bulk ingestion).
+    """
+    from app.services.research import harvest_arxiv, save_paper_stream
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    progress = {"ingested": 0}
+
+    def _committed(total: int) -> None:
+        progress["ingested"] = total
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta=progress)
+
+    async def _run() -> dict:
+        engine = create_async_engine(settings.DATABASE_URL, echo=False)
+        async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            async with async_session() as db:
+                await save_paper_stream(
+                    db, harvest_arxiv(query, max_results), uuid.UUID(owner_id), on_progress=_committed
+                )
+            return {**progress, "error": None}
+        except Exception as exc:
+            # Batches committed before the failure are kept and counted
+            logger.error("arXiv harvest failed (%s) after %d papers: %s", query, progress["ingested"], exc)
+            return {**progress, "error": str(exc)}
+        finally:
+            await engine.dispose()
+
+    return run_async(_run())
+
+
+@celery_app.task(bind=True, name="mining_ai.research.reindex")
+def reindex_papers_task(self) -> dict:
+    """
+    Celery task: re-embed every paper into a new research collection and
+    switch searches over to it (see services.reindex). Resumes from the last
+    checkpoint if a previous run was interrupted; progress (papers done,
+    papers/second) is published as PROGRESS state meta.
+    """
+    from app.services.reindex import reindex_papers
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    def _report(progress: dict) -> None:
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta=progress)
+
+    async def _run() -> dict:
+        engine = create_async_engine(settings.DATABASE_URL, echo=False)
+        async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            return await reindex_papers(async_session, on_progress=_report)
+        finally:
+            await engine.dispose()
+
+    result = run_async(_run())
+    logger.info("Reindex finished: %s", result)
+    return result
+
+
+@celery_app.task(name="mining_ai.research.reconcile_vectors")
+def reconcile_vectors_task() -> dict:
+    """
+    Celery beat task: re-embed papers missing from the research collection
+    and purge vectors whose paper no longer exists (see services.reconcile).
+    """
+    from app.services.reconcile import reconcile_vectors
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async def _run() -> dict:
+        engine = create_async_engine(settings.DATABASE_URL, echo=False)
+        async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            return await reconcile_vectors(async_session)
+        finally:
+            await engine.dispose()
+
+    return run_async(_run())
+
+
+@celery_app.task(name="mining_ai.research.index_pending")
+def index_pending_papers_task(retry_failed: bool = False) -> dict:
+    """
+    Celery task: embed papers saved with index_status 'pending' (write-behind
+    indexing). The beat sweep also retries failed ones.
+    """
+    from app.services import metrics
+    from app.services.research import index_pending, publish_indexed
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async def _run() -> dict:
+        engine = create_async_engine(settings.DATABASE_URL, echo=False)
+        async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        processed = indexed = 0
+        try:
+            async with async_session() as db:
+                while True:
+                    claimed, done = await index_pending(db, settings.INDEXING_BATCH_SIZE, retry_failed)
+                    await db.commit()
+                    await publish_indexed(db, done)
+                    db.expunge_all()
+                    processed += claimed
+                    indexed += len(done)
+                    if not claimed or len(done) < claimed:
+                        break
+                if retry_failed:
+                    backlog = await db.scalar(
+                        select(func.count()).select_from(Paper).where(Paper.index_status != "indexed")
+                    )
+                    await metrics.set_gauge("papers.index.pending", backlog)
+            return {"processed": processed, "indexed": indexed}
+        finally:
+            await engine.dispose()
 
-    asyncio.run(_run())
-    return {"ingested": ingested, "errors": errors}
+    return run_async(_run())
@@ -0,0 +1,79 @@
+"""
+Mining AI Backend - Upstream Response Cache Tests (needs the configured Redis).
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from redis.asyncio import Redis
+
+from app.config import get_settings
+from app.services import cache, metrics
+
+settings = get_settings()
+
+
+@pytest.fixture
+async def provider(monkeypatch: pytest.MonkeyPatch):
+    """A throwaway provider namespace in the upstream cache."""
+    client = Redis.from_url(settings.REDIS_URL)
+    monkeypatch.setattr(cache, "get_redis", lambda: client)
+    monkeypatch.setattr(metrics, "get_redis", lambda: client)
+    monkeypatch.setattr(cache.settings, "UPSTREAM_CACHE_ENABLED", True)
+    name = f"test_{uuid.uuid4().hex}"
+    yield name
+    keys = [key async for key in client.scan_iter(f"upstream:{name}:*")]
+    if keys:
+        await client.delete(*keys)
+    await client.aclose()
+
+
+def _loader(value, calls: list):
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return value
+    return load
+
+
+async def test_second_call_is_served_from_cache(provider: str) -> None:
+    calls: list = []
+    for _ in range(2):
+        assert await cache.cached(provider, "doi:10.1/x", _loader({"title": "T"}, calls), ttl=60) == {"title": "T"}
+    assert len(calls) == 1
+
+
+async def test_empty_results_are_cached_as_misses(provider: str) -> None:
+    calls: list = []
+    for _ in range(2):
+        assert await cache.cached(provider, "search:q", _loader([], calls), ttl=60, empty=[]) == []
+    assert len(calls) == 1
+
+
+async def test_loader_errors_are_not_cached(provider: str) -> None:
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        await cache.cached(provider, "doi:10.1/y", failing, ttl=60)
+    calls: list = []
+    assert await cache.cached(provider, "doi:10.1/y", _loader({"title": "Y"}, calls), ttl=60) == {"title": "Y"}
+    assert len(calls) == 1
+
+
+async def test_concurrent_misses_load_once(provider: str) -> None:
+    calls: list = []
+    load = _loader({"title": "Z"}, calls)
+    results = await asyncio.gather(*(cache.cached(provider, "doi:10.1/z", load, ttl=60) for _ in range(5)))
+    assert results == [{"title": "Z"}] * 5
+    assert len(calls) == 1
+
+
+async def test_bulk_round_trip(provider: str) -> None:
+    await cache.set_many(provider, {"id:a": {"title": "A"}, "id:b": None}, ttl=60)
+    assert await cache.get_many(provider, ["id:a", "id:b", "id:c"]) == {"id:a": {"title": "A"}, "id:b": None}
+
+
+def test_normalize_query() -> None:
+    assert cache.normalize_query("  Graph   Neural\tNetworks ") == "graph neural networks"
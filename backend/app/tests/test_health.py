@@ -5,6 +5,9 @@ Mining AI Backend - Health Endpoint Smoke Tests.
 import pytest
 from httpx import AsyncClient
 
+from app.api import deps
+from app.services import metrics
+
 
 @pytest.mark.anyio
 async def test_health_check(async_client: AsyncClient) -> None:
@@ -33,3 +36,35 @@ async def test_stub_routes_return_501(async_client: AsyncClient) -> None:
         assert response.status_code == 501, (
             f"Expected 501 from {route}, got {response.status_code}"
         )
+
+
+@pytest.mark.anyio
+async def test_metrics_snapshot_shape(async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify /metrics exposes counters, gauges and histograms."""
+    monkeypatch.setattr(deps.settings, "METRICS_TOKEN", "scrape-token")
+    response = await async_client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"counters", "gauges", "histograms"}
+
+
+@pytest.mark.anyio
+async def test_metrics_requires_token(async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify /metrics is hidden without METRICS_TOKEN and rejects a wrong token."""
+    monkeypatch.setattr(deps.settings, "METRICS_TOKEN", None)
+    assert (await async_client.get("/metrics")).status_code == 404
+
+    monkeypatch.setattr(deps.settings, "METRICS_TOKEN", "scrape-token")
+    assert (await async_client.get("/metrics")).status_code == 401
+    response = await async_client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_metrics_snapshot_survives_redis_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify snapshot() returns empty metrics instead of raising when Redis is down."""
+    def _unavailable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(metrics, "get_redis", _unavailable)
+    assert await metrics.snapshot() == {"counters": {}, "gauges": {}, "histograms": {}}
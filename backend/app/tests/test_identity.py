@@ -0,0 +1,57 @@
+"""
+Mining AI Backend - Paper Identity Resolution Tests (no external services).
+"""
+
+import pytest
+
+from app.services.identity import canonical_key, merge_duplicates, normalize_arxiv_id
+
+
+def test_shared_doi_merges_despite_arxiv_mismatch() -> None:
+    """A DOI match wins over disagreeing arXiv IDs, so the batch has one canonical key."""
+    papers = [
+        {"doi": "10.1/X", "arxiv_id": "2301.00001", "title": "A", "year": 2023},
+        {"doi": "https://doi.org/10.1/x", "arxiv_id": "2301.00002v1", "title": "A", "year": 2023},
+    ]
+    merged, index = merge_duplicates(papers)
+    assert index == [0, 0]
+    assert [canonical_key(p) for p in merged] == ["doi:10.1/x"]
+    assert merged[0]["arxiv_id"] == "2301.00001"
+
+
+def test_title_match_keeps_conflicting_ids_apart() -> None:
+    """Same title and year but different DOIs are different papers with distinct keys."""
+    papers = [
+        {"doi": "10.1/a", "title": "Deep Mining", "year": 2020},
+        {"doi": "10.1/b", "title": "Deep mining!", "year": 2020},
+        {"title": "Deep Mining", "year": 2020},
+    ]
+    merged, index = merge_duplicates(papers)
+    assert index == [0, 1, 0]
+    assert [canonical_key(p) for p in merged] == ["doi:10.1/a", "doi:10.1/b"]
+
+
+def test_canonical_keys_are_unique_per_merged_record() -> None:
+    """ID-less duplicates collapse instead of sharing a content-hash key."""
+    papers = [
+        {"title": "", "abstract": "same"},
+        {"title": "", "abstract": "same"},
+        {"arxiv_id": "2301.00001", "title": "B"},
+        {"arxiv_id": "2301.00001v3", "doi": "10.1/b"},
+    ]
+    merged, index = merge_duplicates(papers)
+    assert index == [0, 0, 1, 1]
+    keys = [canonical_key(p) for p in merged]
+    assert len(keys) == len(set(keys))
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("2301.00001v2", "2301.00001"),
+    ("https://arxiv.org/abs/2301.00001", "2301.00001"),
+    ("cs.AI/0001001", "cs/0001001"),
+    ("http://arxiv.org/abs/cs/0001001v1", "cs/0001001"),
+    ("math-ph/0101001v3", "math-ph/0101001"),
+])
+def test_arxiv_ids_normalize_to_atom_form(raw: str, expected: str) -> None:
+    """Requested ids and the ids arXiv returns end up in the same form."""
+    assert normalize_arxiv_id(raw) == expected
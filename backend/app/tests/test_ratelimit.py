@@ -0,0 +1,71 @@
+"""
+Mining AI Backend - Upstream Rate Limiter Tests (needs the configured Redis).
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from redis.asyncio import Redis
+
+from app.config import get_settings
+from app.services import metrics, ratelimit
+
+settings = get_settings()
+
+INTERVAL = 0.2  # seconds per slot (5 requests per second, burst 1)
+
+
+@pytest.fixture
+async def provider(monkeypatch: pytest.MonkeyPatch):
+    """A throwaway provider name limited to one request per INTERVAL."""
+    client = Redis.from_url(settings.REDIS_URL)
+    monkeypatch.setattr(ratelimit, "get_redis", lambda: client)
+    monkeypatch.setattr(metrics, "get_redis", lambda: client)
+    monkeypatch.setattr(ratelimit, "_limits", lambda _: (1 / INTERVAL, 1))
+    monkeypatch.setattr(ratelimit.settings, "RATE_LIMIT_ENABLED", True)
+    name = f"test_{uuid.uuid4().hex}"
+    yield name
+    await client.delete(f"ratelimit:{name}:tat", f"ratelimit:{name}:blocked_until")
+    await client.aclose()
+
+
+async def test_slots_are_spaced_by_the_interval(provider: str) -> None:
+    assert await ratelimit.acquire(provider) == 0
+    assert await ratelimit.acquire(provider) == pytest.approx(INTERVAL, abs=0.05)
+
+
+async def test_refused_caller_reserves_nothing(provider: str) -> None:
+    """A wait longer than max_wait raises RateLimited and leaves the schedule as it was."""
+    await ratelimit.acquire(provider)
+    with pytest.raises(ratelimit.RateLimited) as refused:
+        await ratelimit.acquire(provider, max_wait=0.05)
+    assert refused.value.wait == pytest.approx(INTERVAL, abs=0.05)
+    assert await ratelimit.acquire(provider) == pytest.approx(INTERVAL, abs=0.05)
+
+
+async def test_deadline_bounds_the_wait(provider: str) -> None:
+    await ratelimit.acquire(provider)
+    with ratelimit.deadline(0.05), pytest.raises(ratelimit.RateLimited):
+        await ratelimit.acquire(provider)
+    with ratelimit.deadline(1):
+        assert await ratelimit.acquire(provider) > 0
+
+
+async def test_cancelled_waiter_gives_its_slot_back(provider: str) -> None:
+    await ratelimit.acquire(provider)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(ratelimit.acquire(provider), timeout=0.05)
+    assert await ratelimit.acquire(provider) < INTERVAL
+
+
+async def test_penalize_blocks_the_provider(provider: str) -> None:
+    await ratelimit.penalize(provider, 0.3)
+    assert await ratelimit.acquire(provider) == pytest.approx(0.3, abs=0.05)
+
+
+def test_parse_retry_after() -> None:
+    assert ratelimit.parse_retry_after("5") == 5.0
+    assert ratelimit.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert ratelimit.parse_retry_after("soon") is None
+    assert ratelimit.parse_retry_after(None) is None
@@ -0,0 +1,37 @@
+"""
+Mining AI Backend - Library Search Helper Tests (no external services).
+"""
+
+import uuid
+
+import pytest
+
+from app.services.research import RRF_K, reciprocal_rank_fusion
+from app.services.search_cache import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("offset", [0, 10, 199, 10_000])
+def test_cursor_round_trips(offset: int) -> None:
+    assert decode_cursor(encode_cursor(offset)) == offset
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "e30", "WzFd", "eyJvZmZzZXQiOiAtMX0", "eyJvZmZzZXQiOiAieCJ9"])
+def test_malformed_cursor_raises_value_error(cursor: str) -> None:
+    """Garbage, {}, [1], a negative offset and a non-numeric offset are all rejected."""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_rrf_favours_papers_found_by_both_rankings() -> None:
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    fused = reciprocal_rank_fusion([[a, b], [c, b]])
+    assert fused[b] == pytest.approx(2 / (RRF_K + 2))
+    assert fused[a] == fused[c] == pytest.approx(1 / (RRF_K + 1))
+    assert max(fused, key=fused.get) == b
+
+
+def test_rrf_of_one_ranking_keeps_its_order() -> None:
+    ranking = [uuid.uuid4() for _ in range(5)]
+    fused = reciprocal_rank_fusion([ranking])
+    assert sorted(fused, key=fused.get, reverse=True) == ranking
+    assert reciprocal_rank_fusion([]) == {}
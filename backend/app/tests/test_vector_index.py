@@ -0,0 +1,107 @@
+"""
+Mining AI Backend - Local Vector Index Tests (no external services).
+"""
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import VectorIndex, matches
+
+
+def _vectors(n: int, dim: int = 32) -> np.ndarray:
+    return np.random.default_rng(7).normal(size=(n, dim)).astype(np.float32)
+
+
+def _fill(index: VectorIndex, vectors: np.ndarray) -> None:
+    index.upsert(
+        ids=[f"p{i}" for i in range(len(vectors))],
+        embeddings=vectors.tolist(),
+        metadatas=[{"paper_id": f"p{i}", "year": 2000 + i % 10, "source": "arxiv" if i % 2 else "manual"}
+                   for i in range(len(vectors))],
+        documents=[f"doc {i}" for i in range(len(vectors))],
+    )
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_query_returns_nearest_first(tmp_path, dtype: str) -> None:
+    """The stored vector closest to the query ranks first with ~zero distance."""
+    vectors = _vectors(500)
+    index = VectorIndex(tmp_path, dtype=dtype)
+    _fill(index, vectors)
+    results = index.query(vectors[42].tolist(), n_results=5)
+    assert results[0]["chroma_id"] == "p42"
+    assert results[0]["distance"] < 0.01
+    assert [r["distance"] for r in results] == sorted(r["distance"] for r in results)
+
+
+def test_where_filter_scopes_candidates(tmp_path) -> None:
+    """paper_id $in, year range and source clauses restrict the result set."""
+    vectors = _vectors(200)
+    index = VectorIndex(tmp_path)
+    _fill(index, vectors)
+    where = {"$and": [
+        {"paper_id": {"$in": ["p1", "p3", "p4", "p13"]}},
+        {"year": {"$gte": 2003}},
+        {"source": "arxiv"},
+    ]}
+    results = index.query(vectors[1].tolist(), n_results=10, where=where)
+    assert {r["chroma_id"] for r in results} == {"p3", "p13"}
+
+
+def test_reopen_and_delete_persist(tmp_path) -> None:
+    """A reopened index sees the same rows; deleted ids stay gone and slots are reused."""
+    vectors = _vectors(100)
+    index = VectorIndex(tmp_path)
+    _fill(index, vectors)
+    index.delete(["p10"])
+
+    reopened = VectorIndex(tmp_path)
+    assert len(reopened) == 99
+    assert reopened.query(vectors[10].tolist(), n_results=1)[0]["chroma_id"] != "p10"
+    reopened.upsert(["new"], [vectors[10].tolist()], [{"paper_id": "new"}])
+    assert reopened.query(vectors[10].tolist(), n_results=1)[0]["chroma_id"] == "new"
+    assert reopened.get(["p5"])[0][3] == "doc 5"
+
+
+def test_list_ids_pages_every_row(tmp_path) -> None:
+    """Paging with list_ids visits each stored id once; contains reports stored ids only."""
+    index = VectorIndex(tmp_path)
+    _fill(index, _vectors(25))
+    index.delete(["p3"])
+    pages = [index.list_ids(offset, 10) for offset in range(0, 30, 10)]
+    assert sorted(i for page in pages for i in page) == sorted(f"p{i}" for i in range(25) if i != 3)
+    assert index.contains(["p2", "p3", "missing"]) == {"p2"}
+
+
+def test_ivf_probe_finds_exact_match(tmp_path) -> None:
+    """With IVF partitions an unfiltered search still finds an indexed vector."""
+    vectors = _vectors(2000)
+    index = VectorIndex(tmp_path, ivf_lists=16, ivf_probe=4)
+    _fill(index, vectors)
+    index.maybe_train()
+    assert index._centroids is not None
+    assert index.query(vectors[321].tolist(), n_results=1)[0]["chroma_id"] == "p321"
+
+
+def test_instances_sharing_a_directory_never_reuse_slots(tmp_path) -> None:
+    """Writers in other processes are seen before allocating, so ids never share a slot."""
+    vectors = _vectors(3)
+    a, b = VectorIndex(tmp_path), VectorIndex(tmp_path)
+    a.upsert(["a"], [vectors[0].tolist()], [{"paper_id": "a"}])
+    b.upsert(["b"], [vectors[1].tolist()], [{"paper_id": "b"}])
+    a.upsert(["c"], [vectors[2].tolist()], [{"paper_id": "c"}])
+    b.delete(["a"])
+
+    assert a.contains(["a", "b", "c"]) == {"b", "c"}
+    reopened = VectorIndex(tmp_path)
+    assert len({reopened._slots[i] for i in ("b", "c")}) == 2
+    for i, record_id in ((1, "b"), (2, "c")):
+        assert reopened.query(vectors[i].tolist(), n_results=1)[0]["chroma_id"] == record_id
+        assert b.query(vectors[i].tolist(), n_results=1)[0]["chroma_id"] == record_id
+
+
+def test_matches_operators() -> None:
+    meta = {"year": 2020, "source": "arxiv", "field_computer_science": True}
+    assert matches(meta, {"$or": [{"year": {"$lt": 2000}}, {"source": "arxiv"}]})
+    assert matches(meta, {"field_computer_science": True})
+    assert not matches(meta, {"year": {"$nin": [2019, 2020]}})
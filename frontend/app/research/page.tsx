@@ -11,6 +11,8 @@ export default function ResearchPage() {
   const [searchQuery, setSearchQuery] = useState("");
   const [searchResults, setSearchResults] = useState<any[]>([]);
   const [searching, setSearching] = useState(false);
+  const [searchCursor, setSearchCursor] = useState<string | null>(null);
+  const [searchedQuery, setSearchedQuery] = useState("");
   const [ingestQuery, setIngestQuery] = useState("");
   const [ingestDoi, setIngestDoi] = useState("");
   const [ingestMode, setIngestMode] = useState<"query" | "doi">("query");
@@ -33,8 +35,21 @@ export default function ResearchPage() {
     setSearching(true);
     try {
       const res = await research.search(searchQuery);
-      setSearchResults(res.data);
-    } catch { setSearchResults([]); }
+      setSearchResults(res.data.items);
+      setSearchCursor(res.data.next_cursor);
+      setSearchedQuery(searchQuery);
+    } catch { setSearchResults([]); setSearchCursor(null); }
+    finally { setSearching(false); }
+  };
+
+  const handleLoadMore = async () => {
+    if (!searchCursor) return;
+    setSearching(true);
+    try {
+      const res = await research.search(searchedQuery, 10, searchCursor);
+      setSearchResults((prev) => [...prev, ...res.data.items]);
+      setSearchCursor(res.data.next_cursor);
+    } catch { setSearchCursor(null); }
     finally { setSearching(false); }
   };
 
@@ -47,8 +62,12 @@ export default function ResearchPage() {
         ? { doi: ingestDoi }
         : { query: ingestQuery, limit: 5 };
       const res = await research.ingest(payload);
-      const count = Array.isArray(res.data) ? res.data.length : 1;
-      setIngestMsg(`Ingested ${count} paper${count !== 1 ? "s" : ""} successfully.`);
+      const count = res.data.papers?.length ?? 0;
+      const failed = (res.data.sources ?? []).filter((s: any) => s.status !== "ok").map((s: any) => s.source.replace("_", " "));
+      setIngestMsg(
+        `Ingested ${count} paper${count !== 1 ? "s" : ""} successfully.` +
+          (failed.length ? ` Unavailable: ${failed.join(", ")}.` : "")
+      );
       qc.invalidateQueries({ queryKey: ["papers"] });
       setIngestQuery(""); setIngestDoi("");
     } catch (err: any) {
@@ -62,6 +81,11 @@ export default function ResearchPage() {
         <div className="flex-1 min-w-0">
           <div className="flex items-start gap-2 mb-1">
             <h3 className="font-medium text-sm leading-snug line-clamp-2">{paper.title}</h3>
+            {paper.index_status && paper.index_status !== "indexed" && (
+              <span className="shrink-0 text-xs px-1.5 py-0.5 rounded bg-amber-100 text-amber-700 font-medium">
+                Indexing…
+              </span>
+            )}
             {score !== undefined && (
               <span className="shrink-0 text-xs px-1.5 py-0.5 rounded bg-green-100 text-green-700 font-medium">
                 {Math.round(score * 100)}%
@@ -127,6 +151,12 @@ export default function ResearchPage() {
                 {searchResults.map((r: any) => (
                   <PaperCard key={r.paper.id} paper={r.paper} score={r.score} />
                 ))}
+                {searchCursor && (
+                  <button type="button" onClick={handleLoadMore} disabled={searching}
+                          className="w-full py-2 text-sm text-muted-foreground hover:text-foreground disabled:opacity-60">
+                    Load more
+                  </button>
+                )}
               </div>
             )}
           </div>
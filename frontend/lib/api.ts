@@ -107,10 +107,12 @@ export const projects = {
 export const research = {
   list: (skip = 0, limit = 20) =>
     apiClient.get("/research/papers", { params: { skip, limit } }),
-  search: (query: string, limit = 10) =>
-    apiClient.post("/research/papers/search", { query, limit }),
+  search: (query: string, limit = 10, cursor?: string) =>
+    apiClient.post("/research/papers/search", { query, limit, cursor }),
   ingest: (payload: { doi?: string; arxiv_id?: string; query?: string; limit?: number }) =>
     apiClient.post("/research/papers/ingest", payload),
+  ingestBatch: (payload: { dois?: string[]; arxiv_ids?: string[] }) =>
+    apiClient.post("/research/papers/ingest/batch", payload),
   remove: (id: string) => apiClient.delete(`/research/papers/${id}`),
 };
 